@@ -13,6 +13,30 @@ def norm_label(x:str)->str:
     x = x.strip().lower().replace(" ", "_")
     return LABEL_MAP.get(x, x)
 
+# MS-ASL signer boxes (normalized x, y, w, h) from build_msasl_manifest.py, keyed by the
+# clip name msasl_download_and_trim.py gives the downloaded clips (yt_id_startms_endms)
+MSASL_ALL = Path("artifacts/manifests/msasl_all.csv")
+BOX_COLUMNS = ["box_x","box_y","box_w","box_h"]
+
+def msasl_boxes():
+    if not MSASL_ALL.exists(): return {}
+    ms = pd.read_csv(MSASL_ALL, dtype={"yt_id": str})
+    if "box_format" not in ms.columns:
+        # Written before the conversion: box_x..box_h still hold the raw [y0, x0, y1, x1]
+        print(f"⚠️  {MSASL_ALL} has unconverted signer boxes; re-run build_msasl_manifest.py "
+              f"to use them (extract_landmarks.py --roi). Continuing without boxes.")
+        return {}
+    ms = ms[ms["box_format"] == "xywh"].dropna(subset=BOX_COLUMNS)
+    x, y, w, h = (ms[c] for c in BOX_COLUMNS)
+    valid = (x >= 0) & (y >= 0) & (w > 0) & (h > 0) & (x + w <= 1.0 + 1e-6) & (y + h <= 1.0 + 1e-6)
+    if (~valid).any():
+        print(f"⚠️  Ignoring {int((~valid).sum())} signer boxes outside the frame in {MSASL_ALL}")
+    ms = ms[valid]
+    clips = ms["yt_id"] + "_" + (ms["start_time"]*1000).astype(int).astype(str) + "_" + (ms["end_time"]*1000).astype(int).astype(str)
+    return dict(zip(clips, ms[BOX_COLUMNS].itertuples(index=False, name=None)))
+
+NO_BOX = dict(box_x=None, box_y=None, box_w=None, box_h=None)
+
 def video_meta(p):
     cap = cv2.VideoCapture(str(p))
     if not cap.isOpened(): return dict(fps=None, frames=None, width=None, height=None)
@@ -40,12 +64,13 @@ if kag_dir.exists():
                 label=label,
                 media_type="image",
                 fps=0, frames=1, width=None, height=None,
-                signer=None, session=None, split=None
+                signer=None, session=None, split=None, **NO_BOX
             ))
 
 # 2.2 MS-ASL (videos you selected; place them under data/msasl/<label>/*.mp4)
 ms_dir = Path(CFG["msasl_clips_dir"])
 if ms_dir.exists():
+    boxes = msasl_boxes()
     for label_dir in sorted(ms_dir.glob("*")):
         if not label_dir.is_dir(): continue
         label = norm_label(label_dir.name)
@@ -59,7 +84,8 @@ if ms_dir.exists():
                 label=label,
                 media_type="video",
                 fps=m["fps"], frames=m["frames"], width=m["width"], height=m["height"],
-                signer=None, session=None, split=None
+                signer=None, session=None, split=None,
+                **(dict(zip(BOX_COLUMNS, boxes[vid.stem])) if vid.stem in boxes else NO_BOX)
             ))
 
 # 2.3 Personal (videos in personal/S1..S5/<label>/*.mp4)
@@ -82,7 +108,8 @@ if per_dir.exists():
                     fps=m["fps"], frames=m["frames"], width=m["width"], height=m["height"],
                     signer="you", session=session,
                     # session-wise split rule from your report:
-                    split = "train" if session in {"S1","S2","S3"} else ("val" if session=="S4" else ("test" if session=="S5" else None))
+                    split = "train" if session in {"S1","S2","S3"} else ("val" if session=="S4" else ("test" if session=="S5" else None)),
+                    **NO_BOX
                 ))
 
 df = pd.DataFrame(rows)
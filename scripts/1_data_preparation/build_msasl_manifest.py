@@ -14,6 +14,16 @@ def yt_id(url):
     m = re.search(r"(?:v=|youtu\.be/)([A-Za-z0-9_\-]{6,})", url or "")
     return m.group(1) if m else ""
 
+# Marks box_x..box_h as converted; older files hold MS-ASL's raw [y0, x0, y1, x1] there
+BOX_FORMAT = "xywh"
+
+def signer_box(box):
+    # MS-ASL stores the signer box as normalized [y0, x0, y1, x1] → x, y, w, h (normalized)
+    if not isinstance(box, list) or len(box) != 4 or any(v is None for v in box):
+        return [None]*4
+    y0, x0, y1, x1 = map(float, box)
+    return [x0, y0, x1 - x0, y1 - y0]
+
 def load(p): 
     with open(p, "r", encoding="utf-8") as f: 
         return json.load(f)
@@ -61,7 +71,7 @@ def rows_from(split, items):
         dur    = float(x.get("end_time", 0.0)) - float(x.get("start_time", 0.0))
         if end <= start or dur < 0.5:
             continue
-        box = x.get("box") or [None]*4
+        box = signer_box(x.get("box"))
         yield {
             "sample_id": f"{split}_{i}",
             "split": split,
@@ -76,7 +86,7 @@ def rows_from(split, items):
             "end_time": float(x.get("end_time", 0.0)),
             "duration_sec": max(0.0, dur),
             "yt_url": url, "yt_id": yt_id(url),
-            "box_x": box[0], "box_y": box[1], "box_w": box[2], "box_h": box[3],
+            "box_x": box[0], "box_y": box[1], "box_w": box[2], "box_h": box[3], "box_format": BOX_FORMAT,
             "local_path": ""  # will be filled after download/trim
         }
 
@@ -88,7 +98,7 @@ for split, fname in [("train","MSASL_train.json"),("val","MSASL_val.json"),("tes
 
 cols = ["sample_id","split","label_text","label_id","signer_id","fps","width","height",
         "start","end","frames","start_time","end_time","duration_sec","yt_url","yt_id",
-        "box_x","box_y","box_w","box_h","local_path"]
+        "box_x","box_y","box_w","box_h","box_format","local_path"]
 
 with open(OUT_CSV, "w", newline="", encoding="utf-8") as fo:
     w = csv.DictWriter(fo, fieldnames=cols); w.writeheader()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Precompute seeded augmentation variants of the training features (offline augmentation).
+
+Every training sample gets --variants copies with a deterministic yaw
+rotation, scale and translation (same distributions as the online
+BatchAugment), stored as one [K, T, 75, 4] file per sample in
+artifacts/features_aug/ together with the parameters used (params.csv).
+The loader then reads variant (epoch + sample) % K of each sample, so an
+epoch costs no augmentation CPU at all:
+
+    python scripts/2_preprocessing/augment_features.py --variants 8
+    create_dataloaders(..., offline_augment=True)  # + train_loader.dataset.set_epoch(epoch)
+
+Reruns only rebuild samples whose features or augmentation settings changed.
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse, time, yaml, pandas as pd
+from pathlib import Path
+
+from src.data.variants import write_variants
+
+CFG = yaml.safe_load(open("configs/config.yaml"))
+MANIFEST = Path(CFG["manifest_out"])
+FEATURES_DIR = Path(CFG["artifacts_root"]) / "features"
+AUG_DIR = Path(CFG["artifacts_root"]) / "features_aug"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", type=int, default=4, help="augmented copies per sample (K)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--split", type=str, default="train", help="manifest split to augment")
+    parser.add_argument("--rotation-deg", type=float, default=15.0, help="max |yaw| in degrees")
+    parser.add_argument("--p-rotation", type=float, default=0.5)
+    parser.add_argument("--scale-range", type=float, nargs=2, default=[0.9, 1.1])
+    parser.add_argument("--p-scale", type=float, default=0.5)
+    parser.add_argument("--translation", type=float, default=0.1, help="max |shift| per axis")
+    parser.add_argument("--p-translation", type=float, default=0.5)
+    args = parser.parse_args()
+
+    df = pd.read_csv(MANIFEST, dtype={"id": str})
+    ids = df.loc[df["split"] == args.split, "id"].tolist()
+
+    start = time.perf_counter()
+    params = write_variants(
+        FEATURES_DIR, AUG_DIR, ids,
+        num_variants=args.variants,
+        seed=args.seed,
+        rotation_deg=args.rotation_deg,
+        p_rotation=args.p_rotation,
+        scale_range=tuple(args.scale_range),
+        p_scale=args.p_scale,
+        translation=args.translation,
+        p_translation=args.p_translation,
+    )
+    elapsed = time.perf_counter() - start
+
+    n_samples = params["id"].nunique()
+    print(f"✅ {n_samples}/{len(ids)} {args.split} samples × {args.variants} variants in {elapsed:.1f}s → {AUG_DIR}")
+    print("Use create_dataloaders(..., offline_augment=True) and call train_loader.dataset.set_epoch(epoch)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,104 +1,581 @@
-import os, yaml, numpy as np, pandas as pd
+#!/usr/bin/env python3
+"""
+Extract MediaPipe Holistic landmarks for every manifest item.
+
+Modes:
+  landmarks  write raw [T, 543, 4] landmarks to artifacts/landmarks (default);
+             preprocess_features.py turns them into features
+  features   fused: select pose + hands, normalize and smooth in memory and
+             write [T, 75, 4] features straight to artifacts/features, skipping
+             the 543-point intermediate. The face block (468 points) is only
+             kept when --save-face is given, in artifacts/face_landmarks
+
+Every output is fingerprinted with the stage parameters (max_frames, EMA
+alpha, ... and in features mode the feature parameters) and the media file's
+identity; reruns only redo outputs whose fingerprint changed.
+
+With --target-fps, videos recorded faster than the target keep only every
+k-th frame (k = round(source fps / target)); skipped frames are grabbed but
+never decoded or passed to Holistic. The effective rate of the stored frames
+(source fps / k) is written to fps.csv next to the outputs.
+
+With --roi, frames of items with a signer box in the manifest (MS-ASL) are
+cropped to the box grown by --roi-margin, and --max-side shrinks Holistic's
+input; landmarks are mapped back to normalized full-frame coordinates, so
+outputs stay comparable with uncropped ones.
+
+Items are extracted on --workers processes, each with its own Holistic
+models built once, and handed out longest video first so no long clip is
+left running alone at the end. Outputs are written atomically, so a killed
+or concurrent run never leaves a partial file. Each task is a chunk of
+consecutive items whose frames a decoder thread reads into a bounded queue
+(--queue-size) while Holistic drains it, prefetching the next video; queue
+depth and stall counters are reported at the end.
+
+    python scripts/2_preprocessing/extract_landmarks.py --mode features --workers 32
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse, os, queue, threading, time, yaml, numpy as np, pandas as pd
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 import cv2, mediapipe as mp
 
+from src.data.encoding import ENCODINGS, encode_features, init_encoding
+from src.data.feature_index import hand_presence, pack_presence, update_fps, update_hand_presence, update_lengths
+from src.utils.fingerprint import (append_fingerprints, compact_fingerprints, file_identity,
+                                   fingerprint, stale_ids)
+from src.utils.io import atomic_save_npy
+from src.preprocessing.holistic import crop_rect, crop_to_frame, holistic_to_array
+from src.preprocessing.landmarks import IDX_FACE, NUM_LANDMARKS, clip_xy
+from src.preprocessing.pipeline import SAVGOL_POLYORDER, SAVGOL_WINDOW, feature_params, fused_pipeline
+from src.preprocessing.smoothing import smooth_ema
+
 CFG = yaml.safe_load(open("configs/config.yaml"))
 MANIFEST = Path(CFG["manifest_out"])
 OUT_DIR = Path(CFG["artifacts_root"]) / "landmarks"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
+FEATURES_DIR = Path(CFG["artifacts_root"]) / "features"
+FACE_DIR = Path(CFG["artifacts_root"]) / "face_landmarks"
 
 mp_holistic = mp.solutions.holistic
 mp_drawing  = mp.solutions.drawing_utils
 
-# Order: face(468), pose(33), left(21), right(21) → total 543 points, each (x,y,z,visibility?)
-IDX_SIZES = dict(face=468, pose=33, left=21, right=21)
+# Signer box columns of the manifest (normalized x, y, w, h; MS-ASL rows only)
+BOX_COLUMNS = ["box_x", "box_y", "box_w", "box_h"]
 
-def frame_landmarks(rgb, holo):
-    res = holo.process(rgb)
-    pts = []
-    # face
-    if res.face_landmarks and res.face_landmarks.landmark:
-        for lm in res.face_landmarks.landmark:
-            pts.append([lm.x, lm.y, lm.z, 1.0])
-    else:
-        pts.extend([[0,0,0,0]]*IDX_SIZES["face"])
-    # pose
-    if res.pose_landmarks and res.pose_landmarks.landmark:
-        for lm in res.pose_landmarks.landmark:
-            pts.append([lm.x, lm.y, lm.z, lm.visibility])
-    else:
-        pts.extend([[0,0,0,0]]*IDX_SIZES["pose"])
-    # left hand
-    if res.left_hand_landmarks and res.left_hand_landmarks.landmark:
-        for lm in res.left_hand_landmarks.landmark:
-            pts.append([lm.x, lm.y, lm.z, 1.0])
-    else:
-        pts.extend([[0,0,0,0]]*IDX_SIZES["left"])
-    # right hand
-    if res.right_hand_landmarks and res.right_hand_landmarks.landmark:
-        for lm in res.right_hand_landmarks.landmark:
-            pts.append([lm.x, lm.y, lm.z, 1.0])
-    else:
-        pts.extend([[0,0,0,0]]*IDX_SIZES["right"])
-    return np.array(pts, dtype=np.float32)  # [543,4]
-
-def smooth_ema(arr, alpha=0.4):
-    out = np.copy(arr)
-    for t in range(1, len(arr)):
-        out[t] = alpha*arr[t] + (1-alpha)*out[t-1]
-    return out
-
-df = pd.read_csv(MANIFEST)
-
-# OPTIMIZATION 1: Use static_image_mode=True for images, separate model for videos
-holo_static = mp_holistic.Holistic(static_image_mode=True, model_complexity=0)   # faster for images
-holo_video  = mp_holistic.Holistic(static_image_mode=False, model_complexity=1)  # for videos
-
-# OPTIMIZATION 2: Filter out already processed items upfront
-df["out_path"] = df["id"].apply(lambda x: OUT_DIR / f"{x}.npy")
-df_todo = df[~df["out_path"].apply(lambda p: p.exists())].copy()
-print(f"Processing {len(df_todo)}/{len(df)} items (skipping {len(df) - len(df_todo)} existing)")
-
-processed = 0
-for _, row in tqdm(df_todo.iterrows(), total=len(df_todo), desc="Extracting landmarks"):
-    out_path = row["out_path"]
-    
+# Stage parameters (part of every output fingerprint)
+MAX_FRAMES = 300
+ROI_MARGIN = 0.25
+EMA_ALPHA = 0.4
+LANDMARKS_VERSION = 2  # bump when a code change alters the landmarks
+
+# Holistic models of this process (built by init_worker)
+HOLO_STATIC = None
+HOLO_VIDEO = None
+
+def frame_landmarks(rgb, holo, out=None):
+    """
+    Run Holistic on one RGB frame.
+    Args:
+        rgb: [H, W, 3] frame
+        holo: Holistic model
+        out: optional [543, 4] float32 destination (e.g. one row of a
+            preallocated [T, 543, 4] video buffer)
+    Returns:
+        pts: [543, 4] landmarks (see src.preprocessing.holistic.holistic_to_array)
+    """
+    return holistic_to_array(holo.process(rgb), out)
+
+def landmark_params(max_frames=MAX_FRAMES, ema_alpha=EMA_ALPHA, target_fps=None, roi_margin=None, max_side=None):
+    """Parameters that determine a landmark file, used for its fingerprint."""
+    params = dict(
+        stage="landmarks",
+        version=LANDMARKS_VERSION,
+        max_frames=max_frames,
+        ema_alpha=ema_alpha,
+        clip_xy=(0, 1),
+        model_complexity=dict(image=0, video=1),
+    )
+    if target_fps:
+        params["target_fps"] = target_fps  # only when sampling, so existing outputs stay up to date
+    if roi_margin is not None:
+        params["roi_margin"] = roi_margin  # the signer box itself is part of each item's fingerprint
+    if max_side:
+        params["max_side"] = max_side
+    return params
+
+def sampling_stride(source_fps, target_fps=None):
+    """
+    Keep every stride-th frame so the sampled rate is as close to target_fps
+    as whole frames allow; uniform spacing keeps frame offsets proportional
+    to time.
+    Args:
+        source_fps: the video's frame rate (0 if unknown)
+        target_fps: desired sampling rate, None to keep every frame
+    Returns:
+        (stride, effective_fps) with effective_fps = source_fps / stride
+        (0 if the source rate is unknown, in which case every frame is kept)
+    """
+    if not source_fps or source_fps <= 0:
+        return 1, 0.0
+    stride = max(1, round(source_fps / target_fps)) if target_fps else 1
+    return stride, source_fps / stride
+
+def decode_frames(row, settings):
+    """
+    Open one manifest item for decoding.
+    Args:
+        row: manifest row (dict); its signer box (x, y, w, h) is used with --roi
+        settings: max_frames, target_fps (see sampling_stride), roi_margin
+            (None: no crop) and max_side (None: full resolution)
+    Returns:
+        (fps, roi, frames): the effective frame rate (0 for images / unknown),
+        the crop (x0, y0, w, h) in normalized frame coordinates (None: full
+        frame) and an iterator of the [H, W, 3] RGB frames to run Holistic on
+        (empty for an unreadable image)
+    """
+    if row["media_type"] == "image":
+        bgr = cv2.imread(row["path"])
+        if bgr is None:
+            return 0.0, None, iter(())
+        rect = item_rect(row, bgr.shape[1], bgr.shape[0], settings)
+        return 0.0, rect_roi(rect, bgr.shape[1], bgr.shape[0]), iter([holistic_input(bgr, rect, settings["max_side"])])
+
+    cap = cv2.VideoCapture(row["path"])
+    stride, fps = sampling_stride(cap.get(cv2.CAP_PROP_FPS), settings["target_fps"])
+    width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    rect = item_rect(row, width, height, settings)
+    frames = video_frames(cap, stride, settings["max_frames"], rect, settings["max_side"])
+    return fps, rect_roi(rect, width, height), frames
+
+def item_rect(row, width, height, settings):
+    """Pixel crop of an item: its signer box grown by the margin, or None (full frame)."""
+    if settings["roi_margin"] is None:
+        return None
+    return crop_rect(row.get("box"), width, height, settings["roi_margin"])
+
+def rect_roi(rect, width, height):
+    """Pixel crop → (x0, y0, w, h) in normalized frame coordinates (for crop_to_frame)."""
+    if rect is None:
+        return None
+    x0, y0, x1, y1 = rect
+    return x0 / width, y0 / height, (x1 - x0) / width, (y1 - y0) / height
+
+def holistic_input(bgr, rect=None, max_side=None):
+    """
+    Crop a BGR frame to rect (x0, y0, x1, y1), shrink it so its longer side is
+    at most max_side and convert it to RGB. Cropping and scaling first leaves
+    fewer pixels to convert.
+    """
+    if rect is not None:
+        x0, y0, x1, y1 = rect
+        bgr = bgr[y0:y1, x0:x1]
+    h, w = bgr.shape[:2]
+    if max_side and max(h, w) > max_side:
+        scale = max_side / max(h, w)
+        bgr = cv2.resize(bgr, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+def video_frames(cap, stride=1, max_frames=MAX_FRAMES, rect=None, max_side=None):
+    """Decode every stride-th frame of an opened video, at most max_frames of them (see holistic_input)."""
     try:
-        if row["media_type"] == "image":
-            bgr = cv2.imread(row["path"])
-            if bgr is None:
-                continue  # skip corrupted images
-            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-            pts = frame_landmarks(rgb, holo_static)[None, ...]  # [1, 543, 4]
-        else:
-            cap = cv2.VideoCapture(row["path"])
-            frames = []
-            frame_count = 0
-            max_frames = 300  # OPTIMIZATION 3: Cap video length to avoid very long videos
-            while frame_count < max_frames:
-                ok, bgr = cap.read()
-                if not ok: break
-                rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-                frames.append(frame_landmarks(rgb, holo_video))
-                frame_count += 1
-            cap.release()
-            pts = np.stack(frames, axis=0) if frames else np.zeros((0,543,4), np.float32)
-    except Exception as e:
-        print(f"Error processing {row['id']}: {e}")
-        continue
+        frame_count = 0
+        index = 0
+        # OPTIMIZATION 3: Cap video length (max_frames) to avoid very long videos
+        while frame_count < max_frames:
+            # grab() only demuxes; frames that are not kept are never decoded
+            if not cap.grab(): break
+            skip = index % stride
+            index += 1
+            if skip: continue
+            ok, bgr = cap.retrieve()
+            if not ok: break
+            yield holistic_input(bgr, rect, max_side)
+            frame_count += 1
+    finally:
+        cap.release()
+
+def read_landmarks(row, frames, holo_static, holo_video, max_frames=MAX_FRAMES):
+    """
+    Run Holistic on the decoded frames of one manifest item.
+    Args:
+        frames: RGB frames of the item (see decode_frames)
+    Returns:
+        pts: [T, 543, 4] raw landmarks, or None for an unreadable image
+    """
+    if row["media_type"] == "image":
+        rgb = next(frames, None)
+        if rgb is None:
+            return None  # skip corrupted images
+        return frame_landmarks(rgb, holo_static)[None, ...]  # [1, 543, 4]
+
+    # Landmarks of every frame go straight into one preallocated buffer
+    pts = np.empty((max_frames, NUM_LANDMARKS, 4), dtype=np.float32)
+    frame_count = 0
+    for rgb in frames:
+        frame_landmarks(rgb, holo_video, out=pts[frame_count])
+        frame_count += 1
+    return pts[:frame_count]
+
+class FrameQueue:
+    """
+    Decoder thread for a list of manifest items: decodes their frames one
+    item after the other (running ahead into the next video while Holistic
+    still works on the current one) into a bounded queue that the inference
+    loop drains. cv2 releases the GIL while decoding, so both overlap.
+
+    stats counts, per side, how often and how long it had to wait for the
+    other: decode_stalls (queue full: inference is the bottleneck) and
+    infer_stalls (queue empty: decoding is), plus the queue depth seen by
+    the inference loop.
+    """
+
+    def __init__(self, rows, settings):
+        self.frames = queue.Queue(maxsize=settings["queue_size"])
+        self.stop = threading.Event()
+        self.stats = dict(gets=0, depth_sum=0, depth_max=0, decode_stalls=0, decode_wait=0.0,
+                          infer_stalls=0, infer_wait=0.0)
+        self.thread = threading.Thread(target=self._decode, args=(rows, settings), daemon=True)
+        self.thread.start()
 
+    def _decode(self, rows, settings):
+        # Every item is framed by ("start", i, (fps, roi)) and ("end", i, error)
+        for i, row in enumerate(rows):
+            error = None
+            try:
+                fps, roi, frames = decode_frames(row, settings)
+            except Exception as e:
+                fps, roi, frames, error = 0.0, None, iter(()), e
+            if not self._put(("start", i, (fps, roi))):
+                return
+            try:
+                for rgb in frames:
+                    if not self._put(("frame", i, rgb)):
+                        return  # closed; the generator releases the capture when collected
+            except Exception as e:
+                error = e
+            if not self._put(("end", i, error)):
+                return
+
+    def _put(self, item):
+        """Blocking put that gives up once the queue is closed; returns whether the item was queued."""
+        try:
+            self.frames.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        self.stats["decode_stalls"] += 1
+        start = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.stats["decode_wait"] += time.perf_counter() - start
+        return not self.stop.is_set()
+
+    def _get(self):
+        depth = self.frames.qsize()
+        self.stats["gets"] += 1
+        self.stats["depth_sum"] += depth
+        self.stats["depth_max"] = max(self.stats["depth_max"], depth)
+        try:
+            return self.frames.get_nowait()
+        except queue.Empty:
+            pass
+        self.stats["infer_stalls"] += 1
+        start = time.perf_counter()
+        item = self.frames.get()
+        self.stats["infer_wait"] += time.perf_counter() - start
+        return item
+
+    def item(self, i):
+        """
+        (fps, roi, frames) of the i-th item, like decode_frames; frames raises
+        the item's decoding error. Leftovers of earlier items are skipped.
+        """
+        kind, j, payload = self._get()
+        while not (kind == "start" and j == i):
+            kind, j, payload = self._get()
+        fps, roi = payload
+        return fps, roi, self._frames(i)
+
+    def _frames(self, i):
+        while True:
+            kind, _, payload = self._get()
+            if kind == "end":
+                if payload is not None:
+                    raise payload
+                return
+            yield payload
+
+    def close(self):
+        self.stop.set()
+        while self.thread.is_alive():
+            try:
+                self.frames.get(timeout=0.1)  # unblock a waiting put
+            except queue.Empty:
+                pass
+        self.thread.join()
+
+def postprocess_landmarks(pts, ema_alpha=EMA_ALPHA):
+    """
+    Clip x, y to the image and apply EMA smoothing over time.
+    Both steps act on every point independently, so they can run on the full
+    543 points or on any subset of them.
+    Args:
+        pts: [T, N, 4] raw landmarks (modified in place)
+        ema_alpha: EMA weight of the current frame
+    Returns:
+        smoothed: [T, N, 4] landmarks
+    """
     # normalize by image size using x,y only (z is relative in MediaPipe)
-    xy = pts[..., :2]
-    pts[..., :2] = np.clip(xy, 0, 1)  # already normalized in [0,1], just ensuring
+    pts = clip_xy(pts, 0, 1)  # already normalized in [0,1], just ensuring
 
     # temporal smoothing (simple EMA)
     if len(pts) > 1:
-        pts = smooth_ema(pts, alpha=0.4)
+        pts = smooth_ema(pts, alpha=ema_alpha)
+    return pts
+
+def landmarks_to_features(pts, ema_alpha=EMA_ALPHA, savgol_window=SAVGOL_WINDOW, savgol_polyorder=SAVGOL_POLYORDER):
+    """
+    Fused path from raw landmarks to features, without the 543-point intermediate.
+    Gives the same result as saving postprocess_landmarks(pts) and running
+    preprocess_features.process_sample on it, but only the 75 used points are
+    clipped and smoothed.
+    Args:
+        pts: [T, 543, 4] raw landmarks
+    Returns:
+        features: [T, 75, 4] normalized, smoothed features
+    """
+    return fused_pipeline(ema_alpha, savgol_window, savgol_polyorder)(pts)
+
+def init_worker():
+    """Build this process's Holistic models once (pool initializer, or the main process when serial)."""
+    global HOLO_STATIC, HOLO_VIDEO
+    # OPTIMIZATION 1: Use static_image_mode=True for images, separate model for videos
+    HOLO_STATIC = mp_holistic.Holistic(static_image_mode=True, model_complexity=0)   # faster for images
+    HOLO_VIDEO  = mp_holistic.Holistic(static_image_mode=False, model_complexity=1)  # for videos
 
-    np.save(out_path, pts)  # shape [T, 543, 4]
-    processed += 1
+def close_worker():
+    HOLO_STATIC.close()
+    HOLO_VIDEO.close()
+
+def extract_item(row, settings, decoded=None):
+    """
+    Extract one manifest item with this process's Holistic models and write
+    its output atomically.
+    Args:
+        row: manifest row (dict) with id, path, media_type, out_path
+        settings: mode and stage parameters (see main)
+        decoded: (fps, roi, frames) from a FrameQueue; None decodes on this thread
+    Returns:
+        (id, status, T, hands, fps, error) with status one of 'ok', 'skipped',
+        'error', hands the per-frame hand presence bitmap (features mode) and
+        fps the effective frame rate of the output
+    """
+    try:
+        fps, roi, frames = decoded or decode_frames(row, settings)
+        pts = read_landmarks(row, frames, HOLO_STATIC, HOLO_VIDEO, max_frames=settings["max_frames"])
+        if pts is None:
+            return row["id"], "skipped", 0, "", 0.0, "unreadable image"
+        if roi is not None:
+            pts = crop_to_frame(pts, roi)  # signer crop → full-frame coordinates
+
+        if not settings["fused"]:
+            atomic_save_npy(row["out_path"], postprocess_landmarks(pts, settings["ema_alpha"]))  # [T, 543, 4]
+            return row["id"], "ok", len(pts), "", fps, ""
+
+        if len(pts) == 0:
+            return row["id"], "skipped", 0, "", fps, "no frames"  # empty video, no features
+        if settings["save_face"]:
+            atomic_save_npy(FACE_DIR / f"{row['id']}.npy",
+                            postprocess_landmarks(pts[:, IDX_FACE], settings["ema_alpha"]))
+        features = landmarks_to_features(pts, settings["ema_alpha"], settings["savgol_window"],
+                                         settings["savgol_polyorder"])
+        atomic_save_npy(row["out_path"], encode_features(features, settings["encoding"]))  # [T, 75, 4]
+        return row["id"], "ok", len(features), pack_presence(hand_presence(features)), fps, ""
+    except Exception as e:
+        return row["id"], "error", 0, "", 0.0, f"{type(e).__name__}: {e}"
+
+def extract_chunk(rows, settings):
+    """
+    Extract consecutive manifest items (one pool task). With a queue size > 0
+    a FrameQueue decodes ahead on a background thread while Holistic runs.
+    Returns:
+        (results, stats): extract_item result per row and the FrameQueue
+        counters (empty when decoding inline)
+    """
+    if settings["queue_size"] <= 0:
+        return [extract_item(row, settings) for row in rows], {}
+    frames = FrameQueue(rows, settings)
+    try:
+        return [extract_item(row, settings, frames.item(i)) for i, row in enumerate(rows)], frames.stats
+    finally:
+        frames.close()
+
+def add_stats(total, stats):
+    """Accumulate FrameQueue counters of one chunk."""
+    for key, value in stats.items():
+        total[key] = max(total.get(key, 0), value) if key == "depth_max" else total.get(key, 0) + value
+
+def item_boxes(df):
+    """
+    Signer box (x, y, w, h) of every manifest row, None where the manifest
+    has none (non-MS-ASL rows, or a manifest built without box columns).
+    """
+    if not set(BOX_COLUMNS) <= set(df.columns):
+        print("⚠️  Manifest has no signer box columns (rebuild it with build_manifest.py); --roi has no effect")
+        return [None] * len(df)
+    boxes = df[BOX_COLUMNS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    return [tuple(box) if np.isfinite(box).all() else None for box in boxes]
+
+def longest_first(df, max_frames=MAX_FRAMES):
+    """
+    Order manifest rows by expected work, longest first, so the slowest
+    videos start early and do not form a tail at the end of a parallel run.
+    Uses the manifest's frame count (capped at max_frames) and falls back to
+    the media file size for rows without one.
+    """
+    frames = pd.to_numeric(df["frames"], errors="coerce") if "frames" in df else pd.Series(float("nan"), df.index)
+    size = df["path"].map(lambda p: os.path.getsize(p) if os.path.exists(p) else 0)
+    order = pd.DataFrame({"frames": frames.clip(upper=max_frames).fillna(max_frames), "size": size})
+    return df.loc[order.sort_values(["frames", "size"], ascending=False).index]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["landmarks", "features"], default="landmarks",
+                        help="write raw 543-point landmarks, or 75-point features directly (fused)")
+    parser.add_argument("--save-face", action="store_true",
+                        help="features mode: also save the raw face block to artifacts/face_landmarks")
+    parser.add_argument("--encoding", choices=ENCODINGS, default=None,
+                        help="features mode: on-disk feature encoding (see preprocess_features.py); "
+                             "default: keep the stored one")
+    parser.add_argument("--quant-range", type=float, default=8.0,
+                        help="features mode, int16: max |x|, |y|, |z| representable")
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES, help="cap on frames read per video")
+    parser.add_argument("--target-fps", type=float, default=None,
+                        help="sample videos down to about this frame rate (default: keep every frame)")
+    parser.add_argument("--roi", action="store_true",
+                        help="crop frames to the manifest's signer box (MS-ASL) before Holistic")
+    parser.add_argument("--roi-margin", type=float, default=ROI_MARGIN,
+                        help="--roi: growth of the box on every side, as a fraction of its size")
+    parser.add_argument("--max-side", type=int, default=None,
+                        help="downscale Holistic's input so its longer side is at most this many pixels")
+    parser.add_argument("--ema-alpha", type=float, default=EMA_ALPHA, help="EMA weight of the current frame")
+    parser.add_argument("--savgol-window", type=int, default=SAVGOL_WINDOW, help="features mode")
+    parser.add_argument("--savgol-polyorder", type=int, default=SAVGOL_POLYORDER, help="features mode")
+    parser.add_argument("--content-hash", action="store_true",
+                        help="identify media files by content hash instead of size + mtime")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes, each with its own Holistic models (1 = serial)")
+    parser.add_argument("--chunk-size", type=int, default=4,
+                        help="consecutive items per task; the decoder thread prefetches across them")
+    parser.add_argument("--queue-size", type=int, default=32,
+                        help="decoded frames buffered ahead of Holistic (0 = decode inline, no thread)")
+    args = parser.parse_args()
+
+    fused = args.mode == "features"
+    out_dir = FEATURES_DIR if fused else OUT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if fused and args.save_face:
+        FACE_DIR.mkdir(parents=True, exist_ok=True)
+    encoding = init_encoding(out_dir, args.encoding, args.quant_range) if fused else None
+    roi_margin = args.roi_margin if args.roi else None
+    params = landmark_params(args.max_frames, args.ema_alpha, args.target_fps, roi_margin, args.max_side)
+    if fused:
+        params = dict(landmarks=params, features=feature_params(args.savgol_window, args.savgol_polyorder, encoding),
+                      face=args.save_face)
+
+    df = pd.read_csv(MANIFEST, dtype={"id": str})
+    df["box"] = item_boxes(df) if args.roi else None
+
+    # OPTIMIZATION 2: Filter out up-to-date items upfront (fingerprint of parameters + media file)
+    df["out_path"] = df["id"].apply(lambda x: out_dir / f"{x}.npy")
+    fingerprints = {sample_id: fingerprint(dict(params, box=box) if args.roi else params,
+                                           file_identity(path, args.content_hash))
+                    for sample_id, path, box in zip(df["id"], df["path"], df["box"])}
+    stage = "fused" if fused else "landmarks"  # lets preprocess_features.py tell fused features apart
+    df_todo = df[df["id"].isin(stale_ids(df["id"], out_dir, fingerprints))].copy()
+    df_todo = longest_first(df_todo, args.max_frames)
+    print(f"Processing {len(df_todo)}/{len(df)} items (skipping {len(df) - len(df_todo)} up to date), "
+          f"mode={args.mode}, {args.workers} worker(s)")
+
+    settings = dict(fused=fused, max_frames=args.max_frames, target_fps=args.target_fps, ema_alpha=args.ema_alpha,
+                    save_face=args.save_face, savgol_window=args.savgol_window, savgol_polyorder=args.savgol_polyorder,
+                    encoding=encoding, queue_size=args.queue_size, roi_margin=roi_margin, max_side=args.max_side)
+    rows = df_todo[["id", "path", "media_type", "out_path", "box"]].to_dict("records")
+    chunks = [rows[i:i + args.chunk_size] for i in range(0, len(rows), args.chunk_size)]
+
+    processed = 0
+    lengths = {}  # id -> T (features mode), persisted for the dataloader
+    bitmaps = {}  # id -> per-frame hand presence (features mode), for window pruning
+    rates = {}    # id -> effective fps of the stored frames
+    failures = []
+    stats = {}    # FrameQueue counters, summed over chunks
+
+    def record(result):
+        # Only the main process touches the fingerprint and index files
+        nonlocal processed
+        sample_id, status, T, hands, fps, error = result
+        if status != "ok":
+            if status == "error":
+                failures.append(sample_id)
+                tqdm.write(f"Error processing {sample_id}: {error}")
+            return
+        append_fingerprints(out_dir, {sample_id: fingerprints[sample_id]}, stage=stage)
+        rates[sample_id] = fps
+        if fused:
+            lengths[sample_id] = T
+            bitmaps[sample_id] = hands
+        processed += 1
+
+    with tqdm(total=len(rows), desc="Extracting landmarks") as bar:
+        if args.workers <= 1:
+            init_worker()
+            for chunk in chunks:
+                results, chunk_stats = extract_chunk(chunk, settings)
+                for result in results:
+                    record(result)
+                add_stats(stats, chunk_stats)
+                bar.update(len(chunk))
+            close_worker()
+        else:
+            # Chunks are handed out in submission (longest-first) order as workers free up
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as pool:
+                futures = {pool.submit(extract_chunk, chunk, settings): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    try:
+                        results, chunk_stats = future.result()
+                    except Exception as e:  # worker died (e.g. out of memory)
+                        results, chunk_stats = [(row["id"], "error", 0, "", 0.0, f"{type(e).__name__}: {e}")
+                                                for row in futures[future]], {}
+                    for result in results:
+                        record(result)
+                    add_stats(stats, chunk_stats)
+                    bar.update(len(futures[future]))
+    compact_fingerprints(out_dir)
+    update_fps(out_dir, rates)  # time base of every output, for time-consistent windowing
+
+    if fused:
+        # Keep the indexes in sync so ASLDataset never opens feature files to size or prune windows
+        update_lengths(out_dir, lengths)
+        update_hand_presence(out_dir, bitmaps)
+        print(f"Saved features for {processed} items → {out_dir}")
+        if args.save_face:
+            print(f"Face landmarks [T, 468, 4] → {FACE_DIR}")
+    else:
+        print(f"Saved landmarks for {processed} items → {out_dir}")
+    if stats.get("gets"):
+        print(f"Decode queue: mean depth {stats['depth_sum'] / stats['gets']:.1f}/{args.queue_size} "
+              f"(max {stats['depth_max']}); Holistic waited for frames {stats['infer_stalls']}x "
+              f"({stats['infer_wait']:.1f}s), decoder waited for Holistic {stats['decode_stalls']}x "
+              f"({stats['decode_wait']:.1f}s)")
+    if failures:
+        print(f"⚠️  {len(failures)} items failed (rerun to retry them)")
 
-print(f"Saved landmarks for {processed} items → {OUT_DIR}")
-holo_static.close()
-holo_video.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import sys
+sys.path.insert(0, '.')
+
+import argparse, yaml, pandas as pd
+from pathlib import Path
+
+from src.data.feature_store import pack_features
+
+CFG = yaml.safe_load(open("configs/config.yaml"))
+MANIFEST = Path(CFG["manifest_out"])
+FEATURES_DIR = Path(CFG["artifacts_root"]) / "features"
+PACKED_DIR = Path(CFG["artifacts_root"]) / "features_packed"
+SHARD_BYTES = 1 << 30  # ~1 GiB per shard
+
+parser = argparse.ArgumentParser(description="Pack per-sample feature files into memory-mapped shards")
+parser.add_argument("--shard-bytes", type=int, default=SHARD_BYTES, help="target bytes per shard")
+args = parser.parse_args()
+
+# Pack in manifest order so windows of one split sit close together on disk
+df = pd.read_csv(MANIFEST)
+df = df.sort_values(["split", "id"], na_position="last")
+
+index = pack_features(FEATURES_DIR, PACKED_DIR, ids=df["id"].tolist(), shard_bytes=args.shard_bytes)
+
+print(f"Packed {len(index)}/{len(df)} samples, {int(index['length'].sum())} frames "
+      f"into {index['shard'].nunique()} shard(s) → {PACKED_DIR}")
+print("Use create_dataloaders(..., packed=True) to read windows from the packed store")
@@ -1,234 +1,298 @@
-import os, yaml, numpy as np, pandas as pd
+#!/usr/bin/env python3
+"""
+Turn raw MediaPipe landmarks into normalized, smoothed [T, 75, 4] features.
+
+Samples are processed in chunks on a process pool and every feature file is
+written atomically, so an interrupted run can simply be restarted: finished
+samples are skipped. Every feature file is fingerprinted with the stage
+parameters and its landmark file's identity, so after changing e.g. the
+Savitzky-Golay window only stale features are recomputed. Samples that could
+not be processed are listed in a failure manifest, and throughput is reported
+at the end. With --encoding float16 / int16 features are stored compactly
+(see src.data.encoding) and the measured reconstruction error is reported.
+With --derived, velocities, wrist-relative hand joints and inter-hand
+distances are computed in the same pass and stored as [T, C] float32 files in
+artifacts/features_derived/ with their column layout (channels.json); they
+are fingerprinted separately, so adding channels does not rewrite features.
+
+The transforms themselves live in src.preprocessing (shared with the fused
+extraction mode and online inference).
+
+    python scripts/2_preprocessing/preprocess_features.py --workers 16
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse, os, time, yaml, numpy as np, pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
-from scipy.signal import savgol_filter
+
+from src.data.encoding import ENCODINGS, encode_features, init_encoding, reconstruction_error
+from src.data.feature_index import (hand_presence, load_fps, load_hand_presence, load_lengths, pack_presence,
+                                    read_npy_length, unpack_presence, update_fps, update_hand_presence,
+                                    update_lengths)
+from src.preprocessing.derived import DERIVED_CHANNELS, channel_layout, compute_derived, load_layout, save_layout
+from src.preprocessing.pipeline import SAVGOL_POLYORDER, SAVGOL_WINDOW, feature_params, feature_pipeline
+from src.utils.fingerprint import (append_fingerprints, compact_fingerprints, file_identity,
+                                   fingerprint, load_stages, stale_ids)
+from src.utils.io import atomic_save_npy
 
 CFG = yaml.safe_load(open("configs/config.yaml"))
 MANIFEST = Path(CFG["manifest_out"])
 LANDMARKS_DIR = Path(CFG["artifacts_root"]) / "landmarks"
 FEATURES_DIR = Path(CFG["artifacts_root"]) / "features"
-FEATURES_DIR.mkdir(parents=True, exist_ok=True)
-
-# Landmark indices (from extract_landmarks.py)
-IDX_FACE = slice(0, 468)
-IDX_POSE = slice(468, 468+33)
-IDX_LEFT_HAND = slice(468+33, 468+33+21)
-IDX_RIGHT_HAND = slice(468+33+21, 468+33+21+21)
+DERIVED_DIR = Path(CFG["artifacts_root"]) / "features_derived"
+FAILURES_FILE = "failures.csv"
 
-# Key pose landmarks for normalization (shoulders, hips) - BEFORE extraction
-LEFT_SHOULDER_FULL = 468 + 11   # pose landmark 11 in full array
-RIGHT_SHOULDER_FULL = 468 + 12  # pose landmark 12 in full array
-LEFT_HIP_FULL = 468 + 23        # pose landmark 23 in full array
-RIGHT_HIP_FULL = 468 + 24       # pose landmark 24 in full array
+def derived_params(params, channels):
+    """Parameters that determine a derived-channel file: its features and the channel layout."""
+    return dict(stage="derived", features=params, layout=channel_layout(channels))
 
-# After extraction (pose only, 33 landmarks starting at index 0)
-LEFT_SHOULDER_EXTRACTED = 11    # pose landmark 11 in extracted array
-RIGHT_SHOULDER_EXTRACTED = 12   # pose landmark 12 in extracted array
-LEFT_HIP_EXTRACTED = 23         # pose landmark 23 in extracted array
-RIGHT_HIP_EXTRACTED = 24        # pose landmark 24 in extracted array
-
-def normalize_landmarks_full(pts):
+def process_sample(landmark_path, savgol_window=SAVGOL_WINDOW, savgol_polyorder=SAVGOL_POLYORDER):
     """
-    Normalize landmarks by centering on torso and scaling by shoulder width.
-    Works on FULL landmark array (543 points).
+    Process a single landmark file.
     Args:
-        pts: [T, 543, 4] array of landmarks (x, y, z, visibility)
+        landmark_path: path to .npy file with raw landmarks
+        savgol_window, savgol_polyorder: Savitzky-Golay smoothing parameters
     Returns:
-        normalized: [T, 543, 4] normalized landmarks
+        features: [T, N, 4] processed features
     """
-    normalized = np.copy(pts)
-    
-    for t in range(len(pts)):
-        # Get shoulder and hip positions
-        left_shoulder = pts[t, LEFT_SHOULDER_FULL, :3]
-        right_shoulder = pts[t, RIGHT_SHOULDER_FULL, :3]
-        left_hip = pts[t, LEFT_HIP_FULL, :3]
-        right_hip = pts[t, RIGHT_HIP_FULL, :3]
-        
-        # Check if pose landmarks are valid (visibility > 0)
-        if pts[t, LEFT_SHOULDER_FULL, 3] > 0 and pts[t, RIGHT_SHOULDER_FULL, 3] > 0:
-            # Center point: midpoint of shoulders and hips
-            center = (left_shoulder + right_shoulder + left_hip + right_hip) / 4.0
-            
-            # Scale: shoulder width
-            shoulder_width = np.linalg.norm(right_shoulder - left_shoulder)
-            scale = shoulder_width if shoulder_width > 0.01 else 1.0
-            
-            # Normalize all landmarks
-            normalized[t, :, :3] = (pts[t, :, :3] - center) / scale
-        # else: keep original (likely all zeros for missing pose)
+    # Load raw landmarks
+    pts = np.load(landmark_path)  # [T, 543, 4]
     
-    return normalized
+    if len(pts) == 0:
+        return None  # empty video
+    
+    # Select pose + hands, normalize by torso position and scale, smooth (src.preprocessing)
+    pts = feature_pipeline(savgol_window, savgol_polyorder)(pts)  # [T, 75, 4]
+    
+    return pts
 
-def normalize_landmarks_extracted(pts):
+def process_chunk(tasks, landmarks_dir, features_dir, params, derived_dir=None, channels=()):
     """
-    Normalize extracted landmarks (pose + hands only, 75 points).
+    Process a chunk of samples in a worker process.
     Args:
-        pts: [T, 75, 4] array of extracted landmarks (pose 33 + left hand 21 + right hand 21)
+        tasks: (id, write_features, write_derived) per sample; a sample whose
+            features are up to date is only processed for its derived channels
+        landmarks_dir: directory of raw {id}.npy landmarks
+        features_dir: output directory for {id}.npy features
+        params: stage parameters from feature_params()
+        derived_dir: output directory for {id}.npy derived channels
+        channels: derived channel names (column order)
     Returns:
-        normalized: [T, 75, 4] normalized landmarks
+        results: list of (id, status, T, max_abs_err, sq_err, error, hands) with status
+            one of 'ok', 'missing', 'empty', 'error' and hands the per-frame hand
+            presence bitmap (see src.data.feature_index.pack_presence)
     """
-    normalized = np.copy(pts)
-    
-    for t in range(len(pts)):
-        # Get shoulder and hip positions (now at different indices)
-        left_shoulder = pts[t, LEFT_SHOULDER_EXTRACTED, :3]
-        right_shoulder = pts[t, RIGHT_SHOULDER_EXTRACTED, :3]
-        left_hip = pts[t, LEFT_HIP_EXTRACTED, :3]
-        right_hip = pts[t, RIGHT_HIP_EXTRACTED, :3]
+    results = []
+    for sample_id, write_features, write_derived in tasks:
+        landmark_path = Path(landmarks_dir) / f"{sample_id}.npy"
+        if not landmark_path.exists():
+            results.append((sample_id, "missing", 0, 0.0, 0.0, "landmark file not found", ""))
+            continue
         
-        # Check if pose landmarks are valid (visibility > 0)
-        if pts[t, LEFT_SHOULDER_EXTRACTED, 3] > 0 and pts[t, RIGHT_SHOULDER_EXTRACTED, 3] > 0:
-            # Center point: midpoint of shoulders and hips
-            center = (left_shoulder + right_shoulder + left_hip + right_hip) / 4.0
+        try:
+            # Base features; augmentation is online (BatchAugment) or offline (augment_features.py)
+            features = process_sample(landmark_path,
+                                      savgol_window=params["savgol_window"],
+                                      savgol_polyorder=params["savgol_polyorder"])
             
-            # Scale: shoulder width
-            shoulder_width = np.linalg.norm(right_shoulder - left_shoulder)
-            scale = shoulder_width if shoulder_width > 0.01 else 1.0
+            if features is None or len(features) == 0:
+                results.append((sample_id, "empty", 0, 0.0, 0.0, "no frames", ""))
+                continue
             
-            # Normalize all landmarks
-            normalized[t, :, :3] = (pts[t, :, :3] - center) / scale
-        # else: keep original (likely all zeros for missing pose)
-    
-    return normalized
+            # Save processed features (never leaves a half-written file)
+            max_err = sq_err = 0.0
+            if write_features:
+                encoded = encode_features(features, params["encoding"])
+                atomic_save_npy(Path(features_dir) / f"{sample_id}.npy", encoded)
+                max_err, sq_err = reconstruction_error(features, encoded, params["encoding"])
+            
+            # Derived channels from the float32 features, all channels in one pass
+            if write_derived:
+                atomic_save_npy(Path(derived_dir) / f"{sample_id}.npy", compute_derived(features, channels))
+            results.append((sample_id, "ok", len(features), max_err, sq_err, "", pack_presence(hand_presence(features))))
+        
+        except Exception as e:
+            results.append((sample_id, "error", 0, 0.0, 0.0, f"{type(e).__name__}: {e}", ""))
+    return results
 
-def smooth_savgol(arr, window_length=5, polyorder=2):
+def run(tasks, landmarks_dir, features_dir, workers, chunk_size, params, fingerprints,
+        derived_dir=None, channels=(), derived_fingerprints=None):
     """
-    Apply Savitzky-Golay smoothing to reduce jitter.
+    Process samples in chunks, on a process pool when workers > 1.
+    The fingerprints (id → fingerprint) of finished outputs are recorded after
+    every chunk, so an interrupted run loses at most the chunks in flight.
     Args:
-        arr: [T, N, D] array
-        window_length: smoothing window (must be odd)
-        polyorder: polynomial order
+        tasks: (id, write_features, write_derived) per sample
     Returns:
-        smoothed: [T, N, D] array
+        results: list of (id, status, T, max_abs_err, sq_err, error, hands) in completion order
     """
-    if len(arr) < window_length:
-        return arr  # too short to smooth
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    writes = {sample_id: (write_features, write_derived) for sample_id, write_features, write_derived in tasks}
+    results = []
     
-    # Ensure window_length is odd
-    if window_length % 2 == 0:
-        window_length += 1
+    def record(chunk_results):
+        results.extend(chunk_results)
+        done = [sample_id for sample_id, status, *_ in chunk_results if status == "ok"]
+        append_fingerprints(features_dir, {sample_id: fingerprints[sample_id]
+                                           for sample_id in done if writes[sample_id][0]}, stage="features")
+        if derived_dir is not None:
+            append_fingerprints(derived_dir, {sample_id: derived_fingerprints[sample_id]
+                                              for sample_id in done if writes[sample_id][1]}, stage="features")
     
-    smoothed = np.copy(arr)
-    T, N, D = arr.shape
+    outputs = (landmarks_dir, features_dir, params, derived_dir, channels)
+    with tqdm(total=len(tasks), desc="Preprocessing features") as bar:
+        if workers <= 1:
+            for chunk in chunks:
+                record(process_chunk(chunk, *outputs))
+                bar.update(len(chunk))
+            return results
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_chunk, chunk, *outputs): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    record(future.result())
+                except Exception as e:  # worker died (e.g. out of memory)
+                    results.extend((sample_id, "error", 0, 0.0, 0.0, f"{type(e).__name__}: {e}", "")
+                                   for sample_id, *_ in chunk)
+                bar.update(len(chunk))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", type=str, default=str(MANIFEST))
+    parser.add_argument("--landmarks-dir", type=str, default=str(LANDMARKS_DIR))
+    parser.add_argument("--features-dir", type=str, default=str(FEATURES_DIR))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (1 = serial)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="samples per task sent to a worker")
+    parser.add_argument("--overwrite", action="store_true", help="reprocess all samples, even up-to-date ones")
+    parser.add_argument("--encoding", choices=ENCODINGS, default=None,
+                        help="on-disk feature encoding (float16 halves, int16 quantizes per channel); "
+                             "default: keep the stored one (float32 for a new directory)")
+    parser.add_argument("--quant-range", type=float, default=8.0,
+                        help="int16: max |x|, |y|, |z| representable (torso-normalized units)")
+    parser.add_argument("--savgol-window", type=int, default=SAVGOL_WINDOW)
+    parser.add_argument("--savgol-polyorder", type=int, default=SAVGOL_POLYORDER)
+    parser.add_argument("--content-hash", action="store_true",
+                        help="identify landmark files by content hash instead of size + mtime")
+    parser.add_argument("--derived", nargs="*", choices=list(DERIVED_CHANNELS), default=None,
+                        help="also store these derived channels (no value: all)")
+    parser.add_argument("--derived-dir", type=str, default=str(DERIVED_DIR))
+    args = parser.parse_args()
+    channels = list(DERIVED_CHANNELS) if args.derived == [] else (args.derived or [])
     
-    # Smooth each dimension independently
-    for n in range(N):
-        for d in range(D):
-            # Only smooth if not all zeros (missing landmarks)
-            if np.any(arr[:, n, d] != 0):
-                smoothed[:, n, d] = savgol_filter(arr[:, n, d], window_length, polyorder)
+    landmarks_dir = Path(args.landmarks_dir)
+    features_dir = Path(args.features_dir)
+    features_dir.mkdir(parents=True, exist_ok=True)
+    encoding = init_encoding(features_dir, args.encoding, args.quant_range, overwrite=args.overwrite)
+    params = feature_params(args.savgol_window, args.savgol_polyorder, encoding)
     
-    return smoothed
-
-def extract_relevant_landmarks(pts):
-    """
-    Extract only relevant landmarks (pose + hands, skip face for now).
-    Face landmarks (468 points) are often noisy and less critical for ASL.
-    Args:
-        pts: [T, 543, 4] full landmarks
-    Returns:
-        relevant: [T, 75, 4] (pose 33 + left hand 21 + right hand 21)
-    """
-    # Extract pose + hands
-    pose = pts[:, IDX_POSE, :]      # [T, 33, 4]
-    left_hand = pts[:, IDX_LEFT_HAND, :]   # [T, 21, 4]
-    right_hand = pts[:, IDX_RIGHT_HAND, :] # [T, 21, 4]
-    
-    # Concatenate: [T, 75, 4] (33 + 21 + 21)
-    relevant = np.concatenate([pose, left_hand, right_hand], axis=1)
-    return relevant
-
-def augment_rotation(pts, angle_deg=None):
-    """
-    Apply random rotation augmentation around z-axis (yaw).
-    Args:
-        pts: [T, N, 4] landmarks
-        angle_deg: rotation angle in degrees (if None, random in [-15, 15])
-    Returns:
-        rotated: [T, N, 4] rotated landmarks
-    """
-    if angle_deg is None:
-        angle_deg = np.random.uniform(-15, 15)
-    
-    angle_rad = np.deg2rad(angle_deg)
-    cos_a = np.cos(angle_rad)
-    sin_a = np.sin(angle_rad)
-    
-    # Rotation matrix around z-axis (2D rotation in x-y plane)
-    R = np.array([
-        [cos_a, -sin_a, 0],
-        [sin_a, cos_a, 0],
-        [0, 0, 1]
-    ])
-    
-    rotated = np.copy(pts)
-    rotated[:, :, :3] = pts[:, :, :3] @ R.T
-    return rotated
-
-def process_sample(landmark_path, apply_augmentation=False):
-    """
-    Process a single landmark file.
-    Args:
-        landmark_path: path to .npy file with raw landmarks
-        apply_augmentation: whether to apply rotation augmentation
-    Returns:
-        features: [T, N, 4] processed features
-    """
-    # Load raw landmarks
-    pts = np.load(landmark_path)  # [T, 543, 4]
+    df = pd.read_csv(args.manifest, dtype={"id": str})
+    df["feature_path"] = df["id"].apply(lambda x: features_dir / f"{x}.npy")
     
-    if len(pts) == 0:
-        return None  # empty video
+    # Expected fingerprint of every output: stage parameters + landmark file identity
+    fingerprints = {
+        sample_id: fingerprint(params, file_identity(landmarks_dir / f"{sample_id}.npy", args.content_hash))
+        for sample_id in df["id"]
+    }
     
-    # 1. Extract relevant landmarks (pose + hands only)
-    pts = extract_relevant_landmarks(pts)  # [T, 75, 4]
+    # Skip outputs that are up to date (resuming an interrupted run or rerunning after a change)
+    stale = set(df["id"] if args.overwrite else stale_ids(df["id"], features_dir, fingerprints))
     
-    # 2. Normalize by torso position and scale
-    pts = normalize_landmarks_extracted(pts)  # [T, 75, 4]
+    # Features written by fused extraction (extract_landmarks.py --mode features) have no landmark
+    # file to be recomputed from: keep them instead of reporting them stale / missing
+    stages = load_stages(features_dir)
+    fused = {sample_id for sample_id, path in zip(df["id"], df["feature_path"])
+             if stages.get(sample_id) == "fused" and path.exists()
+             and not (landmarks_dir / f"{sample_id}.npy").exists()}
+    stale -= fused
     
-    # 3. Temporal smoothing
-    pts = smooth_savgol(pts, window_length=5, polyorder=2)  # [T, 75, 4]
+    # Derived channels: own directory, layout and fingerprints (features params + channel layout)
+    derived_dir, derived_fingerprints, stale_derived = None, None, set()
+    if channels:
+        derived_dir = Path(args.derived_dir)
+        derived_dir.mkdir(parents=True, exist_ok=True)
+        layout = channel_layout(channels)
+        if load_layout(derived_dir) != layout:
+            save_layout(derived_dir, layout)
+        d_params = derived_params(params, channels)
+        derived_fingerprints = {
+            sample_id: fingerprint(d_params, file_identity(landmarks_dir / f"{sample_id}.npy", args.content_hash))
+            for sample_id in df["id"]
+        }
+        stale_derived = set(df["id"] if args.overwrite else stale_ids(df["id"], derived_dir, derived_fingerprints))
     
-    # 4. Optional augmentation
-    if apply_augmentation:
-        pts = augment_rotation(pts)  # [T, 75, 4]
+    stale_derived -= fused
     
-    return pts
-
-# Main processing loop
-df = pd.read_csv(MANIFEST)
-
-# Filter out already processed items
-df["feature_path"] = df["id"].apply(lambda x: FEATURES_DIR / f"{x}.npy")
-df_todo = df[~df["feature_path"].apply(lambda p: p.exists())].copy()
-print(f"Processing {len(df_todo)}/{len(df)} items (skipping {len(df) - len(df_todo)} existing)")
-
-processed = 0
-for _, row in tqdm(df_todo.iterrows(), total=len(df_todo), desc="Preprocessing features"):
-    landmark_path = LANDMARKS_DIR / f"{row['id']}.npy"
-    feature_path = row["feature_path"]
-    
-    if not landmark_path.exists():
-        print(f"Warning: landmark file not found for {row['id']}")
-        continue
-    
-    try:
-        # Process without augmentation for base features
-        features = process_sample(landmark_path, apply_augmentation=False)
-        
-        if features is None or len(features) == 0:
+    tasks = [(sample_id, sample_id in stale, sample_id in stale_derived)
+             for sample_id in df["id"] if sample_id in stale or sample_id in stale_derived]
+    print(f"Processing {len(tasks)}/{len(df)} items (skipping {len(df) - len(tasks)} up to date) "
+          f"with {args.workers} worker(s)")
+    if fused:
+        print(f"Keeping {len(fused)} features from fused extraction (no landmark file to recompute them from)")
+    
+    start = time.perf_counter()
+    results = run(tasks, landmarks_dir, features_dir, args.workers, args.chunk_size, params, fingerprints,
+                  derived_dir, channels, derived_fingerprints)
+    elapsed = time.perf_counter() - start
+    compact_fingerprints(features_dir)
+    if derived_dir is not None:
+        compact_fingerprints(derived_dir)
+    
+    results = pd.DataFrame(results, columns=["id", "status", "length", "max_err", "sq_err", "error", "hands"])
+    done = results[results["status"] == "ok"]
+    lengths = dict(zip(done["id"], done["length"]))  # id -> T, persisted for the dataloader
+    bitmaps = dict(zip(done["id"], done["hands"]))   # id -> per-frame hand presence, for window pruning
+    
+    # Backfill features written before the length / hand-presence indexes existed
+    known = load_lengths(features_dir)
+    known_hands = load_hand_presence(features_dir)
+    for sample_id, path in zip(df["id"], df["feature_path"]):
+        if not path.exists():
             continue
-        
-        # Save processed features
-        np.save(feature_path, features)
-        processed += 1
-        
-    except Exception as e:
-        print(f"Error processing {row['id']}: {e}")
-        continue
+        if sample_id not in known and sample_id not in lengths:
+            lengths[sample_id] = read_npy_length(path)  # header read only
+        if sample_id not in known_hands and sample_id not in bitmaps:
+            bitmaps[sample_id] = pack_presence(hand_presence(np.load(path, mmap_mode="r")))
+    
+    # Keep the indexes in sync so ASLDataset never opens feature files to size or prune windows
+    update_lengths(features_dir, lengths)
+    update_hand_presence(features_dir, bitmaps)
+    # Features keep the frames (and so the time base) of their landmarks
+    rates = load_fps(landmarks_dir)
+    update_fps(features_dir, {sample_id: rates[sample_id] for sample_id, path in zip(df["id"], df["feature_path"])
+                              if sample_id in rates and path.exists()})
+    
+    # Failure manifest of this run (rewritten every run; empty when everything succeeded)
+    failures = results[results["status"] != "ok"].sort_values("id")
+    failures[["id", "status", "error"]].to_csv(features_dir / FAILURES_FILE, index=False)
+    
+    frames = int(done["length"].sum())
+    print(f"\nProcessed {len(done)} samples ({frames} frames) → {features_dir}")
+    print(f"Throughput: {len(results) / max(elapsed, 1e-9):.1f} samples/s, "
+          f"{frames / max(elapsed, 1e-9):.1f} frames/s ({elapsed:.1f}s)")
+    if encoding["dtype"] != "float32" and frames > 0:
+        n_values = frames * 75 * 4
+        itemsize = np.dtype(encoding["dtype"]).itemsize
+        print(f"Encoding: {encoding['dtype']} ({n_values * itemsize / 2**20:.1f} MiB vs "
+              f"{n_values * 4 / 2**20:.1f} MiB float32), reconstruction error "
+              f"max {done['max_err'].max():.3g}, RMSE {np.sqrt(done['sq_err'].sum() / n_values):.3g}")
+    if len(done):
+        coverage = np.mean([unpack_presence(bitmap, T).mean() if T else 0.0
+                            for bitmap, T in zip(done["hands"], done["length"])])
+        print(f"Hand presence: {coverage:.1%} of frames per sample on average (hands.csv)")
+    if len(failures):
+        counts = ", ".join(f"{status}={n}" for status, n in failures["status"].value_counts().items())
+        print(f"⚠️  {len(failures)} failed ({counts}) → {features_dir / FAILURES_FILE}")
+    print(f"Feature shape: [T, 75, 4] (pose 33 + left hand 21 + right hand 21)")
+    print(f"Normalization: centered on torso, scaled by shoulder width")
+    print(f"Smoothing: Savitzky-Golay filter (window={args.savgol_window}, poly={args.savgol_polyorder})")
+    if derived_dir is not None:
+        print(f"Derived channels: {', '.join(channels)} ({layout['width']} columns) → {derived_dir}")
 
-print(f"\nProcessed {processed} samples → {FEATURES_DIR}")
-print(f"Feature shape: [T, 75, 4] (pose 33 + left hand 21 + right hand 21)")
-print(f"Normalization: centered on torso, scaled by shoulder width")
-print(f"Smoothing: Savitzky-Golay filter (window=5, poly=2)")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmark data-loading throughput of src/data/dataloader.py on synthetic features.
+
+Creates synthetic [T, 75, 4] feature files, then sweeps num_workers, batch_size,
+stride and augmentation (off, online per batch, or offline precomputed
+variants plus the online temporal shift; building the variants is timed
+once) and measures:
+  - dataset construction time (create_dataloaders)
+  - windows/sec and batches/sec over the train loader
+  - per-stage time per window/batch of the loader's own dataset and collate
+    function (storage read, whole __getitem__, collate, augment)
+
+Results are written as JSON so runs can be compared between commits:
+    python scripts/4_evaluation/benchmark_dataloader.py --workers 0 2 4 --strides 8 16
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse, contextlib, io, itertools, json, subprocess, tempfile, time
+import numpy as np
+import pandas as pd
+import torch
+import yaml
+from pathlib import Path
+
+from src.data.augment import AugmentCollate
+from src.data.dataloader import create_dataloaders
+from src.data.feature_index import update_lengths
+from src.data.variants import write_variants
+
+CFG = yaml.safe_load(open("configs/config.yaml"))
+RESULTS_DIR = Path(CFG["artifacts_root"]) / "benchmarks"
+
+
+def make_synthetic(root: Path, n_samples: int, min_len: int, max_len: int, image_frac: float, seed: int) -> Path:
+    """
+    Write synthetic features, manifest and config under root.
+    A fraction image_frac of samples are single-frame (Kaggle-like images),
+    the rest have T ~ Uniform[min_len, max_len] (MS-ASL-like clips).
+    Returns the path of the generated config.yaml.
+    """
+    rng = np.random.default_rng(seed)
+    features_dir = root / "features"
+    features_dir.mkdir(parents=True, exist_ok=True)
+    labels = [l.lower() for l in CFG["labels"]]
+
+    rows, lengths = [], {}
+    for i in range(n_samples):
+        is_image = rng.random() < image_frac
+        T = 1 if is_image else int(rng.integers(min_len, max_len + 1))
+        sample_id = f"syn_{i:06d}"
+        np.save(features_dir / f"{sample_id}.npy", rng.standard_normal((T, 75, 4)).astype(np.float32))
+        lengths[sample_id] = T
+        rows.append(dict(
+            id=sample_id, source="kaggle" if is_image else "msasl", path="",
+            label=labels[i % len(labels)], media_type="image" if is_image else "video",
+            split=rng.choice(["train", "val", "test"], p=[0.7, 0.15, 0.15])
+        ))
+    update_lengths(features_dir, lengths)
+
+    manifest = root / "manifest.csv"
+    pd.DataFrame(rows).to_csv(manifest, index=False)
+    config = root / "config.yaml"
+    with open(config, "w") as f:
+        yaml.safe_dump({**CFG, "artifacts_root": str(root), "manifest_out": str(manifest)}, f)
+    return config
+
+
+def time_loader(loader, max_batches: int):
+    """Iterate a loader and return (windows, batches, seconds)."""
+    windows = batches = 0
+    start = time.perf_counter()
+    for batch in itertools.islice(loader, max_batches):
+        windows += len(batch[1])
+        batches += 1
+    return windows, batches, time.perf_counter() - start
+
+
+def build_variants(root: Path, num_variants: int, seed: int) -> float:
+    """Write offline augmentation variants of the synthetic train split; returns seconds."""
+    manifest = pd.read_csv(root / "manifest.csv", dtype={"id": str})
+    ids = manifest.loc[manifest["split"] == "train", "id"].tolist()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        write_variants(root / "features", root / "features_aug", ids, num_variants=num_variants, seed=seed)
+    return time.perf_counter() - start
+
+
+def time_stages(loader, batch_size: int, n_batches: int, seed: int):
+    """
+    Replay the train loader's work in the main process and time each stage.
+
+    Every stage calls what the loader itself runs: read is the dataset's
+    storage read (feature file, cache, packed or preloaded store, or this
+    epoch's offline variant, including decoding), getitem the whole
+    __getitem__ (read + pad + tensor), collate the loader's collate function
+    and augment its BatchAugment, if any. getitem runs right after read, so
+    with a feature cache it measures the hit path.
+    Returns mean seconds per window (read, getitem) and per batch (collate, augment).
+    """
+    dataset = loader.dataset
+    augment = loader.collate_fn.augment if isinstance(loader.collate_fn, AugmentCollate) else None
+    collate = loader.collate_fn.collate_fn if augment is not None else loader.collate_fn
+    rng = np.random.default_rng(seed)
+    totals = dict(read=0.0, getitem=0.0, collate=0.0, augment=0.0)
+    n_windows = 0
+
+    for _ in range(n_batches):
+        items = []
+        for idx in rng.integers(len(dataset), size=batch_size):
+            idx = int(idx)
+            t0 = time.perf_counter()
+            dataset._read_item(idx)
+            t1 = time.perf_counter()
+            items.append(dataset[idx])
+            t2 = time.perf_counter()
+            totals["read"] += t1 - t0
+            totals["getitem"] += t2 - t1
+            n_windows += 1
+
+        t0 = time.perf_counter()
+        features, *rest = collate(items)
+        t1 = time.perf_counter()
+        if augment is not None:
+            mask = rest[1] if len(rest) > 1 and rest[1].dtype == torch.bool else None
+            augment(features, mask)
+        t2 = time.perf_counter()
+        totals["collate"] += t1 - t0
+        totals["augment"] += t2 - t1
+
+    return {
+        "read_s_per_window": totals["read"] / n_windows,
+        "getitem_s_per_window": totals["getitem"] / n_windows,
+        "collate_s_per_batch": totals["collate"] / n_batches,
+        "augment_s_per_batch": totals["augment"] / n_batches,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=2000, help="number of synthetic samples")
+    parser.add_argument("--min-len", type=int, default=30, help="min frames of a video sample")
+    parser.add_argument("--max-len", type=int, default=150, help="max frames of a video sample")
+    parser.add_argument("--image-frac", type=float, default=0.5, help="fraction of single-frame samples")
+    parser.add_argument("--data-dir", type=str, default=None, help="reuse/keep synthetic data here")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32])
+    parser.add_argument("--strides", type=int, nargs="+", default=[16])
+    parser.add_argument("--augment", choices=["off", "on", "offline"], nargs="+", default=["off", "on", "offline"],
+                        help="none, online BatchAugment per batch, or precomputed variants")
+    parser.add_argument("--variants", type=int, default=4, help="variants per sample for --augment offline")
+    parser.add_argument("--window-size", type=int, default=32)
+    parser.add_argument("--max-batches", type=int, default=200, help="batches timed per configuration")
+    parser.add_argument("--stage-batches", type=int, default=20, help="batches replayed for stage timing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default=None, help="output JSON path")
+    args = parser.parse_args()
+
+    root = Path(args.data_dir) if args.data_dir else Path(tempfile.mkdtemp(prefix="asl_bench_"))
+    config = root / "config.yaml"
+    if not config.exists():
+        print(f"Generating {args.samples} synthetic samples → {root}")
+        config = make_synthetic(root, args.samples, args.min_len, args.max_len, args.image_frac, args.seed)
+
+    variants_build_s = None
+    if "offline" in args.augment:
+        variants_build_s = build_variants(root, args.variants, args.seed)
+        print(f"Built {args.variants} offline variants per train sample in {variants_build_s:.2f}s")
+
+    results = []
+    grid = itertools.product(args.workers, args.batch_sizes, args.strides, args.augment)
+    for num_workers, batch_size, stride, augment in grid:
+        params = dict(num_workers=num_workers, batch_size=batch_size, stride=stride, augment=augment)
+
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            train_loader, _, _ = create_dataloaders(
+                config_path=str(config),
+                window_size=args.window_size,
+                stride_train=stride,
+                batch_size=batch_size,
+                num_workers=num_workers,
+                augment_train=augment != "off",
+                seed=args.seed,
+                offline_augment=augment == "offline"
+            )
+        construct_s = time.perf_counter() - t0
+
+        windows, batches, seconds = time_loader(train_loader, args.max_batches)
+        stages = time_stages(train_loader, batch_size, args.stage_batches, args.seed)
+
+        result = dict(
+            params,
+            construct_s=construct_s,
+            windows=windows,
+            batches=batches,
+            windows_per_s=windows / seconds if seconds > 0 else 0.0,
+            batches_per_s=batches / seconds if seconds > 0 else 0.0,
+            **stages
+        )
+        results.append(result)
+        print(f"workers={num_workers:2d} batch={batch_size:3d} stride={stride:3d} augment={augment:7s} | "
+              f"construct {construct_s:6.2f}s | {result['windows_per_s']:9.1f} win/s | "
+              f"{result['batches_per_s']:7.1f} batch/s | read {stages['read_s_per_window']*1e6:7.1f}us/win")
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"dataloader_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = dict(
+        commit=git_commit(),
+        dataset=dict(samples=args.samples, min_len=args.min_len, max_len=args.max_len,
+                     image_frac=args.image_frac, window_size=args.window_size, data_dir=str(root)),
+        variants=args.variants,
+        variants_build_s=variants_build_s,
+        results=results
+    )
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\n✅ Wrote {len(results)} results → {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark the per-frame Holistic → array conversion of extract_landmarks.py.
+
+Compares, per frame and on the same Holistic-like results:
+  legacy     543 small Python lists padded with [[0,0,0,0]]*n, then np.array
+  landmarks  per-landmark tuples written into fixed slices of a reused buffer
+  buffer     holistic_to_array: serialized landmark lists decoded with one
+             numpy view each, written into fixed slices of a reused buffer
+
+Uses real MediaPipe landmark protos when mediapipe is installed, otherwise a
+stand-in with the same fields and wire format. Every path is checked against
+the legacy output. Results are written as JSON:
+    python scripts/4_evaluation/benchmark_frame_landmarks.py --frames 2000
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse, json, subprocess, time
+import numpy as np
+import yaml
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.preprocessing.holistic import fill_landmarks, holistic_to_array
+from src.preprocessing.landmarks import IDX_FACE, IDX_LEFT_HAND, IDX_POSE, IDX_RIGHT_HAND, NUM_LANDMARKS
+
+CFG = yaml.safe_load(open("configs/config.yaml"))
+RESULTS_DIR = Path(CFG["artifacts_root"]) / "benchmarks"
+
+
+class StandInLandmarkList:
+    """NormalizedLandmarkList stand-in: .landmark objects and the proto wire format."""
+
+    def __init__(self, values: np.ndarray, visibility: bool):
+        self.values = values.astype(np.float32)
+        self.has_visibility = visibility
+        fields = 4 if visibility else 3
+        self.landmark = [SimpleNamespace(x=float(v[0]), y=float(v[1]), z=float(v[2]),
+                                         visibility=float(v[3]) if visibility else 0.0) for v in self.values]
+        self._fields = fields
+
+    def SerializeToString(self) -> bytes:
+        n, k = len(self.values), self._fields
+        record = np.empty((n, 2 + 5 * k), dtype=np.uint8)
+        record[:, 0], record[:, 1] = 0x0a, 5 * k
+        fields = record[:, 2:].reshape(n, k, 5)
+        fields[:, :, 0] = np.array([0x0d, 0x15, 0x1d, 0x25][:k], dtype=np.uint8)
+        fields[:, :, 1:] = np.ascontiguousarray(self.values[:, :k]).view(np.uint8).reshape(n, k, 4)
+        return record.tobytes()
+
+
+def landmark_list(values: np.ndarray, visibility: bool):
+    """
+    A real NormalizedLandmarkList when mediapipe is installed, else the stand-in.
+    Lists with visibility also get presence, as Holistic's pose landmarks do.
+    """
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except ImportError:
+        return StandInLandmarkList(values, visibility)
+    proto = landmark_pb2.NormalizedLandmarkList()
+    for v in values:
+        lm = proto.landmark.add(x=float(v[0]), y=float(v[1]), z=float(v[2]))
+        if visibility:
+            lm.visibility = float(v[3])
+            lm.presence = 1.0 - float(v[3])
+    return proto
+
+
+def synthetic_results(rng, hands_frac: float):
+    """Holistic-like results: face + pose always, each hand with probability hands_frac."""
+    def part(n, visibility=False, p=1.0):
+        return landmark_list(rng.random((n, 4), dtype=np.float32), visibility) if rng.random() < p else None
+    return SimpleNamespace(
+        face_landmarks=part(468),
+        pose_landmarks=part(33, visibility=True),
+        left_hand_landmarks=part(21, p=hands_frac),
+        right_hand_landmarks=part(21, p=hands_frac),
+    )
+
+
+def legacy_frame_landmarks(res):
+    """The list-based conversion frame_landmarks used before the buffer path."""
+    pts = []
+    if res.face_landmarks and res.face_landmarks.landmark:
+        for lm in res.face_landmarks.landmark:
+            pts.append([lm.x, lm.y, lm.z, 1.0])
+    else:
+        pts.extend([[0,0,0,0]]*468)
+    if res.pose_landmarks and res.pose_landmarks.landmark:
+        for lm in res.pose_landmarks.landmark:
+            pts.append([lm.x, lm.y, lm.z, lm.visibility])
+    else:
+        pts.extend([[0,0,0,0]]*33)
+    for hand in (res.left_hand_landmarks, res.right_hand_landmarks):
+        if hand and hand.landmark:
+            for lm in hand.landmark:
+                pts.append([lm.x, lm.y, lm.z, 1.0])
+        else:
+            pts.extend([[0,0,0,0]]*21)
+    return np.array(pts, dtype=np.float32)
+
+
+def per_landmark_frame(res, out):
+    """Fixed slices of a reused buffer, filled landmark by landmark (no serialization)."""
+    for idx, part, visibility in ((IDX_FACE, res.face_landmarks, False), (IDX_POSE, res.pose_landmarks, True),
+                                  (IDX_LEFT_HAND, res.left_hand_landmarks, False),
+                                  (IDX_RIGHT_HAND, res.right_hand_landmarks, False)):
+        if part is None or not part.landmark:
+            out[idx] = 0
+            continue
+        out[idx] = [(lm.x, lm.y, lm.z, lm.visibility if visibility else 1.0) for lm in part.landmark]
+    return out
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=1000, help="frames converted per path")
+    parser.add_argument("--distinct", type=int, default=50, help="distinct synthetic results cycled through")
+    parser.add_argument("--hands-frac", type=float, default=0.7, help="probability that a hand is detected")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default=None, help="output JSON path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = [synthetic_results(rng, args.hands_frac) for _ in range(args.distinct)]
+    backend = type(results[0].face_landmarks).__name__
+    frames = [results[i % len(results)] for i in range(args.frames)]
+    buffer = np.empty((len(frames), NUM_LANDMARKS, 4), dtype=np.float32)
+
+    paths = {
+        "legacy": lambda: [legacy_frame_landmarks(res) for res in frames],
+        "landmarks": lambda: [per_landmark_frame(res, buffer[t]) for t, res in enumerate(frames)],
+        "buffer": lambda: [holistic_to_array(res, buffer[t]) for t, res in enumerate(frames)],
+    }
+
+    # Same landmarks from every path
+    expected = np.stack(paths["legacy"]())
+    for name in ("landmarks", "buffer"):
+        paths[name]()
+        if not np.array_equal(buffer, expected):
+            print(f"❌ {name} differs from the legacy conversion")
+            sys.exit(1)
+    fill_landmarks(np.empty((33, 4), np.float32), results[0].pose_landmarks)  # warm up
+
+    report = {}
+    for name, fn in paths.items():
+        best = float("inf")
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        report[f"{name}_us_per_frame"] = best / len(frames) * 1e6
+    report["speedup"] = report["legacy_us_per_frame"] / report["buffer_us_per_frame"]
+
+    print(f"Landmark lists: {backend}, {len(frames)} frames, hands detected {args.hands_frac:.0%}")
+    for name in paths:
+        print(f"  {name:9s} {report[f'{name}_us_per_frame']:8.1f} us/frame")
+    print(f"  buffer path is {report['speedup']:.1f}x faster than legacy")
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"frame_landmarks_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(dict(commit=git_commit(), backend=backend, frames=len(frames),
+                                   hands_frac=args.hands_frac, **report), indent=2))
+    print(f"\n✅ Wrote results → {out}")
+
+
+if __name__ == "__main__":
+    main()
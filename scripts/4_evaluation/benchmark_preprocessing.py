@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark the src.preprocessing transforms on synthetic landmarks.
+
+For every sequence length, times each transform on its own (select, clip,
+EMA, normalize, Savitzky-Golay, encode) and the full feature pipeline, then
+compares a per-sequence loop with the batch API over --batch sequences.
+Results are written as JSON so runs can be compared between commits:
+    python scripts/4_evaluation/benchmark_preprocessing.py --lengths 30 150 300 --batch 64
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse, json, subprocess, time
+import numpy as np
+import yaml
+from pathlib import Path
+
+from src.data.encoding import make_encoding
+from src.preprocessing.pipeline import (ClipXY, EMASmooth, Encode, NormalizeTorso, SavgolSmooth,
+                                        SelectPoseHands, feature_pipeline, fused_pipeline)
+
+CFG = yaml.safe_load(open("configs/config.yaml"))
+RESULTS_DIR = Path(CFG["artifacts_root"]) / "benchmarks"
+
+
+def best_time(fn, repeats: int) -> float:
+    """Best wall time of fn() over repeats calls (seconds)."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def synthetic_landmarks(rng, T: int) -> np.ndarray:
+    """[T, 543, 4] landmarks with a hand missing for a third of the clip."""
+    pts = rng.random((T, 543, 4), dtype=np.float32)
+    pts[T // 3:2 * T // 3, 501:522] = 0
+    return pts
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 30, 150, 300], help="frames per sequence")
+    parser.add_argument("--batch", type=int, default=64, help="sequences per batch() call")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default=None, help="output JSON path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    pipeline = feature_pipeline()
+    fused = fused_pipeline()
+    steps = {
+        "select": (SelectPoseHands(), "raw"),
+        "clip": (ClipXY(), "features"),
+        "ema": (EMASmooth(), "features"),
+        "normalize": (NormalizeTorso(), "features"),
+        "savgol": (SavgolSmooth(), "features"),
+        "encode_float16": (Encode(make_encoding("float16")), "features"),
+        "encode_int16": (Encode(make_encoding("int16")), "features"),
+    }
+
+    results = []
+    for T in args.lengths:
+        raw = synthetic_landmarks(rng, T)
+        inputs = {"raw": raw, "features": SelectPoseHands()(raw)}
+        result = {"T": T}
+        for name, (transform, source) in steps.items():
+            result[f"{name}_ms"] = best_time(lambda: transform(inputs[source]), args.repeats) * 1e3
+        result["pipeline_ms"] = best_time(lambda: pipeline(raw), args.repeats) * 1e3
+        result["fused_ms"] = best_time(lambda: fused(raw), args.repeats) * 1e3
+
+        # Many sequences: one call per sequence vs. one batch() call
+        batch = [synthetic_landmarks(rng, T) for _ in range(args.batch)]
+        loop_s = best_time(lambda: [pipeline(seq) for seq in batch], args.repeats)
+        batch_s = best_time(lambda: pipeline.batch(batch), args.repeats)
+        frames = T * args.batch
+        result.update(
+            loop_frames_per_s=frames / loop_s,
+            batch_frames_per_s=frames / batch_s,
+            batch_speedup=loop_s / batch_s,
+        )
+        results.append(result)
+
+        stages = " ".join(f"{name} {result[f'{name}_ms']:.3f}" for name in steps)
+        print(f"T={T:4d} | {stages} | pipeline {result['pipeline_ms']:.3f} ms | "
+              f"loop {result['loop_frames_per_s']:9.0f} vs batch {result['batch_frames_per_s']:9.0f} frames/s "
+              f"({result['batch_speedup']:.1f}x)")
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"preprocessing_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = dict(commit=git_commit(), batch=args.batch, repeats=args.repeats, results=results)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\n✅ Wrote {len(results)} results → {out}")
+
+
+if __name__ == "__main__":
+    main()
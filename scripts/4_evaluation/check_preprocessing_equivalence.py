@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Check that src.preprocessing reproduces the preprocessing script output.
+
+Three checks:
+  stored     run the src pipeline on landmark files and compare with the
+             features preprocess_features.py wrote (decoded; tolerance follows
+             the directory's encoding). Skipped if no features exist.
+  reference  on synthetic landmarks, compare with a frame-by-frame /
+             run-by-run reference (np.linalg.norm per frame,
+             scipy.signal.savgol_filter per channel over every run of frames
+             with visibility > 0) and verify that the batch API and the fused
+             pipeline match the single-sequence path exactly.
+  gaps       a hand missing mid-clip: the gap frames must pass smoothing
+             untouched and the frames before the gap must match smoothing the
+             present run alone (feature and fused pipelines).
+
+Exits with status 1 if any check fails:
+    python scripts/4_evaluation/check_preprocessing_equivalence.py --samples 200
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import numpy as np
+import yaml
+from pathlib import Path
+from scipy.signal import savgol_filter
+
+from src.data.encoding import decode_features, load_encoding
+from src.preprocessing.landmarks import (LEFT_HIP_EXTRACTED, LEFT_SHOULDER_EXTRACTED, RIGHT_HIP_EXTRACTED,
+                                         RIGHT_SHOULDER_EXTRACTED, IDX_POSE, IDX_LEFT_HAND, IDX_RIGHT_HAND,
+                                         clip_xy)
+from src.preprocessing.pipeline import Compose, NormalizeTorso, SelectPoseHands, feature_pipeline, fused_pipeline
+from src.preprocessing.smoothing import smooth_ema
+
+CFG = yaml.safe_load(open("configs/config.yaml"))
+LANDMARKS_DIR = Path(CFG["artifacts_root"]) / "landmarks"
+FEATURES_DIR = Path(CFG["artifacts_root"]) / "features"
+
+# Largest acceptable |difference| per stored encoding
+TOLERANCE = {"float32": 1e-5, "float16": 4e-3, "int16": 2e-3}
+
+
+def present_runs(present):
+    """(start, end) of every run of True values."""
+    edges = np.flatnonzero(np.diff(np.r_[0, present.astype(np.int8), 0]))
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def reference_features(pts, window_length=5, polyorder=2):
+    """Loop implementation the vectorized transforms replaced, smoothing each run of present frames alone."""
+    pts = np.concatenate([pts[:, IDX_POSE], pts[:, IDX_LEFT_HAND], pts[:, IDX_RIGHT_HAND]], axis=1)
+
+    normalized = np.copy(pts)
+    for t in range(len(pts)):
+        ls, rs = pts[t, LEFT_SHOULDER_EXTRACTED, :3], pts[t, RIGHT_SHOULDER_EXTRACTED, :3]
+        lh, rh = pts[t, LEFT_HIP_EXTRACTED, :3], pts[t, RIGHT_HIP_EXTRACTED, :3]
+        if pts[t, LEFT_SHOULDER_EXTRACTED, 3] > 0 and pts[t, RIGHT_SHOULDER_EXTRACTED, 3] > 0:
+            center = (ls + rs + lh + rh) / 4.0
+            shoulder_width = np.linalg.norm(rs - ls)
+            scale = shoulder_width if shoulder_width > 0.01 else 1.0
+            normalized[t, :, :3] = (pts[t, :, :3] - center) / scale
+
+    if len(normalized) < window_length:
+        return normalized
+    if window_length % 2 == 0:
+        window_length += 1
+    if len(normalized) < window_length:
+        return normalized
+    smoothed = np.copy(normalized)
+    for n in range(normalized.shape[1]):
+        for start, end in present_runs(normalized[:, n, 3] > 0):
+            if end - start < window_length:
+                continue
+            for d in range(normalized.shape[2]):
+                smoothed[start:end, n, d] = savgol_filter(normalized[start:end, n, d], window_length, polyorder)
+    return smoothed
+
+
+def check_stored(samples, savgol_window, savgol_polyorder, seed):
+    """Compare the src pipeline with stored script output. Returns (n_checked, failures)."""
+    ids = sorted(p.stem for p in FEATURES_DIR.glob("*.npy") if (LANDMARKS_DIR / p.name).exists())
+    if not ids:
+        print(f"stored: no features with landmarks in {FEATURES_DIR}, skipped")
+        return 0, []
+    rng = np.random.default_rng(seed)
+    ids = list(rng.choice(ids, size=min(samples, len(ids)), replace=False))
+
+    encoding = load_encoding(FEATURES_DIR)
+    tolerance = TOLERANCE[encoding["dtype"] if encoding else "float32"]
+    pipeline = feature_pipeline(savgol_window, savgol_polyorder)
+
+    failures, worst = [], 0.0
+    for sample_id in ids:
+        stored = decode_features(np.load(FEATURES_DIR / f"{sample_id}.npy"), encoding)
+        ours = pipeline(np.load(LANDMARKS_DIR / f"{sample_id}.npy"))
+        if ours.shape != stored.shape:
+            failures.append((sample_id, f"shape {ours.shape} != {stored.shape}"))
+            continue
+        err = float(np.abs(ours - stored).max()) if ours.size else 0.0
+        worst = max(worst, err)
+        if err > tolerance:
+            failures.append((sample_id, f"max |diff| {err:.3g} > {tolerance:g}"))
+    print(f"stored: {len(ids)} samples, max |diff| {worst:.3g} (tolerance {tolerance:g}), {len(failures)} failed")
+    return len(ids), failures
+
+
+def check_reference(lengths, savgol_window, savgol_polyorder, seed):
+    """Compare with the loop reference on synthetic data. Returns (n_checked, failures)."""
+    rng = np.random.default_rng(seed)
+    sequences = [(rng.random((T, 543, 4)) * 1.2 - 0.1).astype(np.float32) for T in lengths]
+    pipeline = feature_pipeline(savgol_window, savgol_polyorder)
+    fused = fused_pipeline(savgol_window=savgol_window, savgol_polyorder=savgol_polyorder)
+
+    failures, worst = [], 0.0
+    singles = []
+    for T, raw in zip(lengths, sequences):
+        ours = pipeline(raw)
+        singles.append(ours)
+        err = float(np.abs(ours - reference_features(raw, savgol_window, savgol_polyorder)).max())
+        worst = max(worst, err)
+        if err > TOLERANCE["float32"]:
+            failures.append((f"synthetic T={T}", f"max |diff| vs reference {err:.3g}"))
+
+        # Fused (clip + EMA on the 75 points only) vs. clip + EMA on all 543 points, then features
+        two_step = clip_xy(np.copy(raw))
+        two_step = smooth_ema(two_step) if len(two_step) > 1 else two_step
+        if not np.array_equal(fused(np.copy(raw)), pipeline(two_step)):
+            failures.append((f"synthetic T={T}", "fused pipeline differs from two-step path"))
+
+    for T, ours, batched in zip(lengths, singles, pipeline.batch(sequences)):
+        if not np.array_equal(ours, batched):
+            failures.append((f"synthetic T={T}", "batch() differs from single-sequence call"))
+    print(f"reference: {len(lengths)} sequences, max |diff| {worst:.3g}, {len(failures)} failed")
+    return len(lengths), failures
+
+
+def check_gaps(savgol_window, savgol_polyorder, seed, T=40, gap=(15, 26)):
+    """Left hand missing in frames gap[0]..gap[1]-1 of a T-frame clip. Returns (n_checked, failures)."""
+    rng = np.random.default_rng(seed)
+    raw = rng.random((T, 543, 4)).astype(np.float32)
+    raw[..., 3] = rng.uniform(0.5, 1.0, (T, 543))
+    raw[gap[0]:gap[1], IDX_LEFT_HAND] = 0  # not detected: all zero, as extract_landmarks writes it
+    left = slice(33, 54)                   # left hand in the 75-point layout
+
+    failures = []
+    pipeline = feature_pipeline(savgol_window, savgol_polyorder)
+    ours = pipeline(raw)
+    err = float(np.abs(ours - reference_features(raw, savgol_window, savgol_polyorder)).max())
+    if err > TOLERANCE["float32"]:
+        failures.append(("gap", f"max |diff| vs run-wise reference {err:.3g}"))
+    before = pipeline(raw[:gap[0]])
+    if np.abs(ours[:gap[0], left] - before[:, left]).max() > TOLERANCE["float32"]:
+        failures.append(("gap", "frames before the gap depend on the gap"))
+    normalized = Compose([SelectPoseHands(), NormalizeTorso("features")])(raw)
+    if not np.array_equal(ours[gap[0]:gap[1], left], normalized[gap[0]:gap[1], left]):
+        failures.append(("gap", "gap frames were changed by smoothing"))
+
+    fused = fused_pipeline(savgol_window=savgol_window, savgol_polyorder=savgol_polyorder)
+    fused_out, fused_before = fused(np.copy(raw)), fused(np.copy(raw[:gap[0]]))
+    if np.abs(fused_out[:gap[0], left] - fused_before[:, left]).max() > TOLERANCE["float32"]:
+        failures.append(("gap", "fused: frames before the gap depend on the gap"))
+    if np.any(fused_out[gap[0]:gap[1], left, 3] != 0):
+        failures.append(("gap", "fused: the missing hand has visibility > 0 (smeared by EMA)"))
+    print(f"gaps: hand missing in frames {gap[0]}-{gap[1] - 1} of {T}, {len(failures)} failed")
+    return 1, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=100, help="stored samples to compare")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 2, 4, 5, 6, 17, 64, 150, 300],
+                        help="synthetic sequence lengths")
+    parser.add_argument("--savgol-window", type=int, default=5, help="must match the stored features")
+    parser.add_argument("--savgol-polyorder", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    _, failures = check_stored(args.samples, args.savgol_window, args.savgol_polyorder, args.seed)
+    _, reference_failures = check_reference(args.lengths, args.savgol_window, args.savgol_polyorder, args.seed)
+    failures += reference_failures
+    failures += check_gaps(args.savgol_window, args.savgol_polyorder, args.seed)[1]
+
+    for name, reason in failures[:20]:
+        print(f"  ✗ {name}: {reason}")
+    if failures:
+        print(f"\n❌ {len(failures)} mismatches")
+        sys.exit(1)
+    print("\n✅ src.preprocessing matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,9 @@ import yaml
 import pandas as pd
 from pathlib import Path
 import sys
+sys.path.insert(0, '.')
+
+from src.data.encoding import decode_features, load_encoding
 
 # Load config
 CFG = yaml.safe_load(open("configs/config.yaml"))
@@ -33,7 +36,7 @@ if not feature_path.exists():
     sys.exit(1)
 
 # Load preprocessed features [T, 75, 4]
-pts = np.load(str(feature_path))
+pts = decode_features(np.load(str(feature_path)), load_encoding(features_dir))
 print(f"Sample: {row['id']}")
 print(f"Label: {row['label']}")
 print(f"Features shape: {pts.shape}")
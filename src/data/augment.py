@@ -0,0 +1,202 @@
+import math
+import torch
+from torch.utils.data import get_worker_info
+from torch.utils.data.dataloader import default_collate
+from typing import Optional, Sequence, Tuple
+
+from src.preprocessing.derived import channel_layout
+
+
+class BatchAugment:
+    """
+    Vectorized augmentation of whole [B, W, 75, 4] batches.
+
+    Every sample gets its own rotation (yaw), scale, translation and circular
+    temporal shift, drawn and applied as a handful of tensor ops instead of
+    per-window numpy code.
+
+    Derived channels of the same batch (see preprocess_features.py --derived)
+    get the same temporal shift, and their linear channels the same geometry:
+    velocities and wrist-relative hand joints are rotated and scaled,
+    inter-hand distances scaled; translation cancels out of all of them.
+
+    Seeding: inside a DataLoader worker the generator is seeded from the
+    worker's seed, which torch derives from the loader's generator for every
+    epoch and worker, so augmentations are distinct across workers and epochs
+    and reproducible when the loader generator is seeded. In the main process
+    a generator seeded with `seed` is used and advances across epochs.
+    """
+
+    def __init__(
+        self,
+        rotation_deg: float = 15.0,
+        p_rotation: float = 0.5,
+        scale_range: Tuple[float, float] = (0.9, 1.1),
+        p_scale: float = 0.5,
+        translation: float = 0.1,
+        p_translation: float = 0.5,
+        max_shift: int = 5,
+        p_shift: float = 0.3,
+        seed: int = 0,
+        derived_channels: Sequence[str] = ()
+    ):
+        """
+        Args:
+            rotation_deg: Maximum absolute yaw rotation in degrees
+            p_rotation: Probability of rotating a sample
+            scale_range: (min, max) uniform scale factor
+            p_scale: Probability of scaling a sample
+            translation: Maximum absolute translation per axis
+            p_translation: Probability of translating a sample
+            max_shift: Temporal shift is drawn from [-max_shift, max_shift)
+            p_shift: Probability of temporally shifting a sample
+            seed: Seed for the main-process generator
+            derived_channels: Column layout (channel names, in order) of the
+                derived tensors passed to __call__
+        """
+        self.rotation_deg = rotation_deg
+        self.p_rotation = p_rotation
+        self.scale_range = scale_range
+        self.p_scale = p_scale
+        self.translation = translation
+        self.p_translation = p_translation
+        self.max_shift = max_shift
+        self.p_shift = p_shift
+        self.seed = seed
+        self.derived_layout = channel_layout(derived_channels) if derived_channels else None
+
+        self._generator = None
+        self._generator_seed = None
+
+    def __getstate__(self):
+        # Workers build their own generator from their worker seed
+        state = self.__dict__.copy()
+        state["_generator"] = None
+        state["_generator_seed"] = None
+        return state
+
+    def _get_generator(self) -> torch.Generator:
+        info = get_worker_info()
+        seed = info.seed if info is not None else self.seed
+        if self._generator is None or self._generator_seed != seed:
+            self._generator = torch.Generator().manual_seed(seed)
+            self._generator_seed = seed
+        return self._generator
+
+    def __call__(self, features: torch.Tensor, mask: Optional[torch.Tensor] = None,
+                 derived: Optional[torch.Tensor] = None):
+        """
+        Args:
+            features: [B, W, 75, 4] batch (x, y, z, visibility)
+            mask: Optional [B, W] bool validity mask of a padded batch; the
+                temporal shift then wraps within each sample's real length
+                and padding stays zero
+            derived: Optional [B, W, C] derived channels of the same windows,
+                laid out as derived_channels
+        Returns:
+            augmented: [B, W, 75, 4] batch, or (augmented, derived) when
+                derived is given
+        """
+        g = self._get_generator()
+        B, W = features.shape[:2]
+        dtype = features.dtype
+        geometric = self.p_rotation > 0 or self.p_scale > 0 or self.p_translation > 0
+        if derived is not None and geometric and (self.derived_layout is None
+                                                  or derived.shape[-1] != self.derived_layout["width"]):
+            raise ValueError("BatchAugment needs the derived_channels layout of the derived tensor "
+                             "to rotate and scale it")
+
+        def apply(p):
+            return torch.rand(B, generator=g) < p
+
+        def uniform(low, high, *shape):
+            return low + (high - low) * torch.rand(B, *shape, generator=g)
+
+        # Geometric part; skipped when disabled (e.g. on offline-augmented variants)
+        out = features
+        if geometric:
+            # Rotation around z-axis (yaw), identity where not applied
+            angle = uniform(-self.rotation_deg, self.rotation_deg) * (math.pi / 180.0)
+            angle = torch.where(apply(self.p_rotation), angle, torch.zeros_like(angle))
+            cos_a, sin_a = torch.cos(angle), torch.sin(angle)
+            R = torch.zeros(B, 3, 3)
+            R[:, 0, 0], R[:, 0, 1] = cos_a, -sin_a
+            R[:, 1, 0], R[:, 1, 1] = sin_a, cos_a
+            R[:, 2, 2] = 1.0
+
+            # Scale
+            scale = uniform(*self.scale_range)
+            scale = torch.where(apply(self.p_scale), scale, torch.ones_like(scale))
+
+            # Translation
+            t = uniform(-self.translation, self.translation, 3)
+            t = t * apply(self.p_translation)[:, None]
+
+            # Fused affine: xyz' = scale * (xyz @ R^T) + t
+            A = (scale[:, None, None] * R).transpose(1, 2).to(dtype)   # [B, 3, 3]
+            xyz = torch.matmul(features[..., :3], A[:, None]) + t.to(dtype)[:, None, None, :]
+            out = torch.cat([xyz, features[..., 3:]], dim=-1)
+            if derived is not None:
+                derived = self._transform_derived(derived, A, scale)
+
+        # Temporal circular shift: out[t] = in[(t - shift) % length]
+        shift = torch.randint(-self.max_shift, self.max_shift, (B,), generator=g)
+        shift = shift * apply(self.p_shift)
+        if shift.any():
+            t_idx = torch.arange(W)[None, :]
+            if mask is None:
+                src = (t_idx - shift[:, None]) % W   # [B, W]
+            else:
+                length = mask.sum(dim=1, keepdim=True).clamp(min=1)
+                src = torch.where(mask, (t_idx - shift[:, None]) % length, t_idx)
+            index = src[:, :, None, None].expand(-1, -1, *out.shape[2:])
+            out = torch.gather(out, 1, index)
+            if derived is not None:
+                derived = torch.gather(derived, 1, src[:, :, None].expand(-1, -1, derived.shape[-1]))
+
+        if mask is not None:
+            out = out * mask[:, :, None, None].to(dtype)
+            if derived is not None:
+                derived = derived * mask[:, :, None].to(derived.dtype)
+
+        return out if derived is None else (out, derived)
+
+    def _transform_derived(self, derived: torch.Tensor, A: torch.Tensor, scale: torch.Tensor) -> torch.Tensor:
+        """Apply the linear part of the batch affine to [B, W, C] derived channels."""
+        B, W = derived.shape[:2]
+        parts = []
+        for entry in self.derived_layout["channels"]:
+            part = derived[..., entry["offset"]:entry["offset"] + entry["width"]]
+            if len(entry["shape"]) == 2:
+                # Per-point xyz differences (velocity, hand_relative): rotate and scale
+                points = part.reshape(B, W, entry["shape"][0], 3)
+                part = torch.matmul(points, A.to(derived.dtype)[:, None]).reshape(B, W, entry["width"])
+            else:
+                # Distances (hand_distance): scale only
+                part = part * scale.to(derived.dtype)[:, None, None]
+            parts.append(part)
+        return torch.cat(parts, dim=-1)
+
+
+class AugmentCollate:
+    """
+    Collate function that batches samples and then applies a BatchAugment.
+
+    If the wrapped collate_fn returns (features, labels, mask, ...) the bool
+    mask is passed on to the augmentation. A per-frame tensor after the
+    labels (and mask), i.e. the derived channels, is augmented together with
+    the features, so both keep describing the same frames.
+    """
+
+    def __init__(self, augment: BatchAugment, collate_fn=default_collate):
+        self.augment = augment
+        self.collate_fn = collate_fn
+
+    def __call__(self, batch):
+        features, *rest = self.collate_fn(batch)
+        mask = rest[1] if len(rest) > 1 and rest[1].dtype == torch.bool else None
+        position = 1 if mask is None else 2
+        if len(rest) <= position:
+            return (self.augment(features, mask), *rest)
+        features, rest[position] = self.augment(features, mask, rest[position])
+        return (features, *rest)
@@ -0,0 +1,100 @@
+import numpy as np
+import torch
+from torch.utils.data import Sampler
+from typing import Iterator, List, Sequence, Tuple
+
+
+class LengthBucketBatchSampler(Sampler[List[int]]):
+    """
+    Batch sampler that groups windows of similar real length.
+
+    Windows are ordered by length (random order among equal lengths when
+    shuffling) and the whole order is cut into batches, so each batch covers
+    a narrow length range and lengths with fewer than batch_size windows
+    share a batch with their neighbours; the batch order is shuffled. Paired
+    with collate_padded, a batch of single-frame Kaggle images is padded to 1
+    frame instead of window_size.
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: int = 0
+    ):
+        """
+        Args:
+            lengths: Real (unpadded) length of every dataset item
+            batch_size: Number of items per batch
+            shuffle: Shuffle items within equal lengths and the batch order
+            drop_last: Leave out len(lengths) % batch_size windows per epoch
+                (drawn at random when shuffling) so every batch is full
+            seed: Base seed; the order changes every epoch (see set_epoch)
+        """
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def _batches(self) -> List[np.ndarray]:
+        n = len(self.lengths)
+        extra = n % self.batch_size if self.drop_last else 0
+        if self.shuffle:
+            rng = np.random.default_rng((self.seed, self.epoch))
+            order = rng.permutation(n)[:n - extra]  # a different random remainder is left out every epoch
+            order = order[np.argsort(self.lengths[order], kind="stable")]
+        else:
+            rng = None
+            order = np.argsort(self.lengths, kind="stable")[:n - extra]
+
+        # Consecutive items of the length order: only batches at the border of two lengths mix them
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+
+        if rng is not None:
+            batches = [batches[i] for i in rng.permutation(len(batches))]
+        return batches
+
+    def __iter__(self) -> Iterator[List[int]]:
+        batches = self._batches()
+        self.epoch += 1
+        for batch in batches:
+            yield batch.tolist()
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+
+def collate_padded(batch: List[Tuple[torch.Tensor, int]]) -> Tuple[torch.Tensor, ...]:
+    """
+    Pad variable-length windows to the longest item in the batch.
+
+    Args:
+        batch: list of ([L_i, 75, 4] tensor, label) items, optionally followed
+            by more per-frame tensors (e.g. [L_i, C] derived channels)
+    Returns:
+        features: [B, L_max, 75, 4] zero-padded tensor
+        labels: [B] tensor
+        mask: [B, L_max] bool tensor, True on real frames
+        *extras: [B, L_max, ...] zero-padded tensors of the extra item entries
+    """
+    lengths = torch.tensor([len(item[0]) for item in batch])
+    L_max = int(lengths.max())
+
+    def pad(position):
+        padded = batch[0][position].new_zeros((len(batch), L_max) + tuple(batch[0][position].shape[1:]))
+        for i, item in enumerate(batch):
+            padded[i, :len(item[position])] = item[position]
+        return padded
+
+    labels = torch.tensor([item[1] for item in batch])
+    mask = torch.arange(L_max)[None, :] < lengths[:, None]
+    return (pad(0), labels, mask, *(pad(position) for position in range(2, len(batch[0]))))
@@ -0,0 +1,76 @@
+import numpy as np
+import torch
+from collections import OrderedDict
+from torch.utils.data import get_worker_info
+from typing import Callable, Dict
+
+# One counter row for the main process plus one per DataLoader worker
+MAX_STAT_SLOTS = 65
+STAT_NAMES = ("hits", "misses", "evictions")
+
+
+class FeatureCache:
+    """
+    Byte-budgeted LRU cache of decoded sample arrays.
+
+    Each process (main or DataLoader worker) keeps its own entries. Hit, miss
+    and eviction counters live in a shared-memory tensor with one row per
+    worker, so the main process can read them after an epoch.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Maximum total size of cached arrays per process
+        """
+        self.max_bytes = max_bytes
+        self.counters = torch.zeros(MAX_STAT_SLOTS, len(STAT_NAMES), dtype=torch.int64).share_memory_()
+
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+
+    def __getstate__(self):
+        # Workers start with an empty cache but share the counter tensor
+        state = self.__dict__.copy()
+        state["_entries"] = OrderedDict()
+        state["_bytes"] = 0
+        return state
+
+    def _count(self, stat: int) -> None:
+        info = get_worker_info()
+        slot = 0 if info is None else 1 + info.id % (MAX_STAT_SLOTS - 1)
+        self.counters[slot, stat] += 1
+
+    def get(self, key: str, load: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Return the cached array for key, calling load() on a miss.
+
+        Cached arrays are marked read-only; callers must copy before mutating.
+        """
+        features = self._entries.get(key)
+        if features is not None:
+            self._entries.move_to_end(key)
+            self._count(0)
+            return features
+
+        self._count(1)
+        features = load()
+        if features.nbytes > self.max_bytes:
+            return features  # larger than the whole budget, don't cache
+
+        features.flags.writeable = False
+        self._entries[key] = features
+        self._bytes += features.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self._count(2)
+        return features
+
+    def stats(self) -> Dict[str, int]:
+        """Counters summed over the main process and all workers."""
+        totals = self.counters.sum(dim=0).tolist()
+        return dict(zip(STAT_NAMES, totals))
+
+    def reset_stats(self) -> None:
+        self.counters.zero_()
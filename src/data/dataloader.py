@@ -3,45 +3,184 @@ import numpy as np
 import pandas as pd
 import yaml
 from pathlib import Path
-from torch.utils.data import Dataset, DataLoader
-from typing import Tuple, List, Optional
+from torch.utils.data import Dataset, DataLoader, WeightedRandomSampler
+from torch.utils.data.dataloader import default_collate
+from typing import Dict, Tuple, List, Optional, Sequence, Union
+
+from src.data.augment import AugmentCollate, BatchAugment
+from src.data.batching import LengthBucketBatchSampler, collate_padded
+from src.data.cache import FeatureCache
+from src.data.encoding import decode_features, load_encoding
+from src.data.feature_index import lookup_hand_presence, lookup_lengths
+from src.data.feature_store import PackedFeatureStore, SharedMemoryFeatureStore
+from src.data.labels import build_label_list
+from src.data.streaming import StreamingASLDataset
+from src.data.variants import VariantStore
+from src.preprocessing.derived import channel_columns, load_layout
+
+# One record per window: sample ordinal (into ASLDataset.sample_ids), first frame, real length, class
+WINDOW_DTYPE = np.dtype([('sample', np.int32), ('start', np.int32), ('length', np.int16), ('label', np.int16)])
+
+
+def build_window_index(lengths: np.ndarray, labels: np.ndarray, window_size: int, stride: int) -> np.ndarray:
+    """
+    Vectorized sliding-window index over many sequences.
+    
+    A sequence of T >= window_size frames gives (T - window_size) // stride + 1
+    windows; a shorter one gives a single window of length T (padded later).
+    
+    Args:
+        lengths: [N] sequence lengths
+        labels: [N] class index per sequence
+    Returns:
+        windows: structured array of WINDOW_DTYPE records
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    full = lengths >= window_size
+    n_windows = np.where(full, (lengths - window_size) // stride + 1, 1)
+    
+    sample = np.repeat(np.arange(len(lengths)), n_windows)
+    first = np.cumsum(n_windows) - n_windows                 # index of each sequence's first window
+    k = np.arange(len(sample)) - np.repeat(first, n_windows)  # window number within its sequence
+    
+    windows = np.empty(len(sample), dtype=WINDOW_DTYPE)
+    windows['sample'] = sample
+    windows['start'] = k * stride
+    windows['length'] = np.where(full[sample], window_size, lengths[sample])
+    windows['label'] = np.asarray(labels)[sample]
+    return windows
+
+
+def window_coverage(windows: np.ndarray, lengths: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """
+    Fraction of frames with a tracked hand in every window.
+
+    Args:
+        windows: WINDOW_DTYPE records (build_window_index)
+        lengths: [N] sequence lengths the windows were built from
+        present: [sum(lengths)] per-frame hand presence, sequence after sequence
+    Returns:
+        coverage: [len(windows)] float in [0, 1]
+    """
+    seq_start = np.cumsum(lengths) - lengths
+    counts = np.concatenate([[0], np.cumsum(present, dtype=np.int64)])
+    first = seq_start[windows['sample']] + windows['start']
+    length = windows['length'].astype(np.int64)
+    return (counts[first + length] - counts[first]) / np.maximum(length, 1)
+
 
 class ASLDataset(Dataset):
     """
     PyTorch Dataset for ASL recognition with windowed sequences.
     
     Loads preprocessed features from artifacts/features/ and creates
-    fixed-length windows for training.
+    fixed-length windows for training. Compactly encoded features (float16 /
+    int16, see src.data.encoding) are decoded to float32 per window.
+    Augmentation is applied per batch (see src.data.augment.BatchAugment),
+    not per window, or precomputed offline (variants_dir): each epoch then
+    reads one of the stored variants of every sample.
+    
+    With derived_channels, every item also carries precomputed derived
+    channels (velocities, wrist-relative hands, inter-hand distances; see
+    src.preprocessing.derived) read from artifacts/features_derived/:
+    (features, label, derived) with derived [window_size, C]. They are read
+    as stored, so batch augmentation does not rotate or scale them.
+    
+    With min_hand_coverage, windows in which fewer than that fraction of
+    frames have a tracked hand (per-frame bitmap written by preprocessing,
+    hands.csv) are dropped from the index, or kept with sampling weight
+    low_coverage_weight; hand_coverage_report() gives the counts per class.
     """
     
     def __init__(
         self,
-        manifest_path: str,
+        manifest_path: Union[str, pd.DataFrame],
         features_dir: str,
         window_size: int = 32,
         stride: int = 16,
         split: Optional[str] = None,
         source_filter: Optional[List[str]] = None,
-        augment: bool = False
+        labels: Optional[Sequence[str]] = None,
+        packed_dir: Optional[Union[str, PackedFeatureStore]] = None,
+        cache_bytes: int = 0,
+        pad_to_window: bool = True,
+        preload: bool = False,
+        variants_dir: Optional[Union[str, VariantStore]] = None,
+        derived_dir: Optional[str] = None,
+        derived_channels: Optional[Sequence[str]] = None,
+        min_hand_coverage: float = 0.0,
+        low_coverage_weight: float = 0.0
     ):
         """
         Args:
-            manifest_path: Path to manifest CSV
+            manifest_path: Path to manifest CSV, or an already loaded manifest
+                DataFrame (an optional 'feature_length' column skips the length lookup)
             features_dir: Directory containing preprocessed .npy files
             window_size: Number of frames per window
             stride: Stride for sliding window (use window_size for non-overlapping)
             split: Filter by split ('train', 'val', 'test', None for all)
             source_filter: Filter by source (e.g., ['kaggle', 'msasl'])
-            augment: Apply data augmentation
+            labels: Global label list defining class indices (e.g. config.yaml
+                `labels`, extended by unlisted manifest labels, see
+                build_label_list); None uses the sorted labels present in this dataset
+            packed_dir: Directory written by pack_features (or an opened
+                PackedFeatureStore to share); when set, windows are sliced from
+                memory-mapped shards instead of per-sample .npy
+            cache_bytes: Per-worker byte budget of an LRU cache of decoded
+                samples, so overlapping windows reuse one np.load (0 disables)
+            pad_to_window: Zero-pad short windows to window_size; disable when
+                batching with LengthBucketBatchSampler + collate_padded
+            preload: Load every sample of this dataset once into a shared-memory
+                tensor that all DataLoader workers read from (needs the split's
+                features to fit in RAM)
+            variants_dir: Directory written by write_variants (or an opened
+                VariantStore); windows of stored samples are then read from
+                variant (epoch + sample) % num_variants, see set_epoch
+            derived_dir: Directory of derived-channel files written by
+                preprocess_features.py --derived
+            derived_channels: Derived channels to load (in this order); their
+                presence and layout version are checked against the stored
+                channels.json
+            min_hand_coverage: Minimum fraction of frames with a tracked hand
+                for a window to count as covered (0 disables the filter)
+            low_coverage_weight: 0 drops windows below min_hand_coverage from
+                the index; > 0 keeps them with this sampling weight (see
+                window_weights; covered windows have weight 1)
         """
-        self.manifest_path = Path(manifest_path)
+        self.manifest_path = None if isinstance(manifest_path, pd.DataFrame) else Path(manifest_path)
         self.features_dir = Path(features_dir)
         self.window_size = window_size
         self.stride = stride
-        self.augment = augment
+        self.pad_to_window = pad_to_window
+        self.min_hand_coverage = min_hand_coverage
+        self.low_coverage_weight = low_coverage_weight
+        if isinstance(packed_dir, PackedFeatureStore):
+            self.store = packed_dir
+        else:
+            self.store = PackedFeatureStore(packed_dir) if packed_dir is not None else None
+        self.cache = FeatureCache(cache_bytes) if cache_bytes > 0 else None
+        self.encoding = load_encoding(self.features_dir)  # None: plain float32 files
+        if isinstance(variants_dir, VariantStore):
+            self.variants = variants_dir
+        else:
+            self.variants = VariantStore(variants_dir) if variants_dir is not None else None
+        self.epoch = 0
+        
+        # Derived channels: verify the stored layout once, then slice columns per window
+        self.derived_dir = Path(derived_dir) if derived_dir is not None else None
+        self.derived_channels = list(derived_channels) if derived_channels else []
+        self.derived_columns = None
+        self.derived_store = None  # SharedMemoryFeatureStore of the selected columns when preloaded
+        if self.derived_channels:
+            if self.derived_dir is None:
+                raise ValueError("derived_channels requires derived_dir")
+            self.derived_columns = channel_columns(load_layout(self.derived_dir), self.derived_channels)
         
         # Load manifest
-        self.df = pd.read_csv(manifest_path)
+        if self.manifest_path is None:
+            self.df = manifest_path
+        else:
+            self.df = pd.read_csv(manifest_path)
         
         # Apply filters
         if split is not None:
@@ -50,7 +189,7 @@ class ASLDataset(Dataset):
             self.df = self.df[self.df['source'].isin(source_filter)]
         
         # Build label mapping
-        self.labels = sorted(self.df['label'].unique())
+        self.labels = build_label_list(self.df['label'], labels)
         self.label_to_idx = {label: idx for idx, label in enumerate(self.labels)}
         self.idx_to_label = {idx: label for label, idx in self.label_to_idx.items()}
         self.num_classes = len(self.labels)
@@ -64,37 +203,69 @@ class ASLDataset(Dataset):
         print(f"  Windows: {len(self.windows)}")
         print(f"  Classes: {self.num_classes}")
         print(f"  Window size: {self.window_size}, Stride: {self.stride}")
+        if self.min_hand_coverage > 0:
+            report = self.hand_coverage_report()
+            action = "pruned" if self.low_coverage_weight == 0 else f"weighted {self.low_coverage_weight:g}"
+            per_class = report[report['low_coverage'] > 0].sort_values('low_coverage', ascending=False)
+            print(f"  Hand coverage < {self.min_hand_coverage:g}: {action} {report['low_coverage'].sum()}"
+                  f"/{report['windows'].sum()} windows in {len(per_class)} classes")
+            if len(per_class):
+                print("    " + ", ".join(f"{row.label}={row.low_coverage}/{row.windows}"
+                                         for row in per_class.head(10).itertuples()))
+        if self.derived_channels:
+            print(f"  Derived channels: {', '.join(self.derived_channels)} ({len(self.derived_columns)} columns)")
+        if self.variants is not None:
+            print(f"  Offline augmentation: {self.variants.num_variants} variants "
+                  f"({np.isin(self.sample_ids, list(self.variants.ids)).sum()}/{len(self.sample_ids)} samples)")
+        
+        # Optionally move all frames into one shared-memory tensor for zero-copy worker reads
+        if preload:
+            self._preload()
     
-    def _build_windows(self) -> List[Tuple[str, int, int, int]]:
+    def _build_windows(self) -> np.ndarray:
         """
-        Build list of (sample_id, start_frame, end_frame, label_idx) tuples.
-        Each tuple represents one training window.
+        Build the window index: a structured array of (sample, start, length, label)
+        records plus self.sample_ids, the id table that 'sample' points into.
+        Flat arrays avoid millions of Python tuples that copy-on-write would
+        duplicate into every DataLoader worker.
         """
-        windows = []
+        # Sequence lengths come from an index, never from loading the arrays
+        ids = self.df['id'].astype(str).tolist()
+        if 'feature_length' in self.df.columns:
+            lengths = self.df['feature_length'].to_numpy()
+        elif self.store is not None:
+            lengths = [self.store.length(i) if i in self.store else -1 for i in ids]
+        else:
+            lengths = lookup_lengths(self.features_dir, ids)
+        lengths = np.asarray(lengths, dtype=np.int64)
         
-        for _, row in self.df.iterrows():
-            feature_path = self.features_dir / f"{row['id']}.npy"
-            
-            if not feature_path.exists():
-                continue
-            
-            # Load to get sequence length
-            features = np.load(feature_path)  # [T, 75, 4]
-            T = len(features)
-            
-            label_idx = self.label_to_idx[row['label']]
-            
-            # Create sliding windows
-            if T < self.window_size:
-                # If sequence is too short, pad it (will handle in __getitem__)
-                windows.append((row['id'], 0, T, label_idx))
-            else:
-                # Sliding window
-                for start in range(0, T - self.window_size + 1, self.stride):
-                    end = start + self.window_size
-                    windows.append((row['id'], start, end, label_idx))
+        # Drop samples whose feature file is missing
+        keep = lengths >= 0
+        self.sample_ids = np.array(ids, dtype=str)[keep]
+        label_idx = self.df['label'].map(self.label_to_idx).to_numpy()[keep]
+        
+        windows = build_window_index(lengths[keep], label_idx, self.window_size, self.stride)
+        self.window_weights = np.ones(len(windows))
+        self._coverage_counts = None
+        if self.min_hand_coverage <= 0:
+            return windows
         
-        return windows
+        # Hand coverage of every window from the per-frame presence bitmaps (no feature reads)
+        present = lookup_hand_presence(self.features_dir, self.sample_ids, lengths[keep])
+        covered = window_coverage(windows, lengths[keep], present) >= self.min_hand_coverage
+        num_classes = len(self.labels)
+        self._coverage_counts = (np.bincount(windows['label'], minlength=num_classes),
+                                 np.bincount(windows['label'][~covered], minlength=num_classes))
+        if self.low_coverage_weight > 0:
+            self.window_weights = np.where(covered, 1.0, self.low_coverage_weight)
+            return windows
+        self.window_weights = self.window_weights[covered]
+        return windows[covered]
+    
+    def window(self, idx: int) -> Tuple[str, int, int, int]:
+        """(sample_id, start_frame, end_frame, label_idx) of one window."""
+        sample, start, length, label = self.windows[idx]
+        return str(self.sample_ids[sample]), int(start), int(start + length), int(label)
     
     def __len__(self) -> int:
         return len(self.windows)
@@ -102,70 +273,118 @@ class ASLDataset(Dataset):
     def __getitem__(self, idx: int) -> Tuple[torch.Tensor, int]:
         """
         Returns:
-            features: [window_size, 75, 4] tensor
+            features: [window_size, 75, 4] tensor ([end - start, 75, 4] if pad_to_window is off)
             label: integer class label
+            derived: [window_size, C] tensor, only when derived_channels is set
         """
-        sample_id, start, end, label_idx = self.windows[idx]
-        
-        # Load features
-        feature_path = self.features_dir / f"{sample_id}.npy"
-        features = np.load(feature_path)  # [T, 75, 4]
+        sample_id, start, end, label_idx = self.window(idx)
+        window = self._read_item(idx)  # [window_size or less, 75, 4]
         
-        # Extract window
-        window = features[start:end]  # [window_size or less, 75, 4]
-        
-        # Pad if necessary
-        if len(window) < self.window_size:
-            pad_length = self.window_size - len(window)
-            padding = np.zeros((pad_length, 75, 4), dtype=np.float32)
-            window = np.concatenate([window, padding], axis=0)
-        
-        # Apply augmentation if enabled
-        if self.augment:
-            window = self._augment(window)
+        # Pad if necessary (also copies read-only memmap/cached windows into a writable array)
+        length = self.window_size if self.pad_to_window else len(window)
+        if len(window) < length or not window.flags.writeable:
+            padded = np.zeros((length,) + window.shape[1:], dtype=np.float32)
+            padded[:len(window)] = window
+            window = padded
         
         # Convert to tensor
         window = torch.from_numpy(window).float()  # [window_size, 75, 4]
         
+        if self.derived_columns is not None:
+            derived = np.zeros((length, len(self.derived_columns)), dtype=np.float32)
+            derived[:end - start] = self._read_derived(sample_id, start, end)
+            return window, label_idx, torch.from_numpy(derived)
+        
         return window, label_idx
     
-    def _augment(self, window: np.ndarray) -> np.ndarray:
-        """
-        Apply random augmentations to a window.
-        Args:
-            window: [T, 75, 4] array
-        Returns:
-            augmented: [T, 75, 4] array
-        """
-        # Random rotation around z-axis (yaw)
-        if np.random.rand() < 0.5:
-            angle = np.random.uniform(-15, 15)
-            angle_rad = np.deg2rad(angle)
-            cos_a = np.cos(angle_rad)
-            sin_a = np.sin(angle_rad)
-            R = np.array([
-                [cos_a, -sin_a, 0],
-                [sin_a, cos_a, 0],
-                [0, 0, 1]
-            ])
-            window[:, :, :3] = window[:, :, :3] @ R.T
+    def set_epoch(self, epoch: int) -> None:
+        """Select the offline augmentation variant of every sample for a new epoch."""
+        self.epoch = epoch
+    
+    def window_lengths(self) -> np.ndarray:
+        """Real (unpadded) length of every window, e.g. for LengthBucketBatchSampler."""
+        return self.windows['length'].astype(np.int64)
+    
+    def _preload(self) -> None:
+        """Replace the feature source with a SharedMemoryFeatureStore of this dataset's samples."""
+        # Frames actually covered by windows of each sample
+        ends = np.zeros(len(self.sample_ids), dtype=np.int64)
+        np.maximum.at(ends, self.windows['sample'], self.windows['start'].astype(np.int64) + self.windows['length'])
+        lengths = {str(sample_id): int(end) for sample_id, end in zip(self.sample_ids, ends)}
         
-        # Random scale
-        if np.random.rand() < 0.5:
-            scale = np.random.uniform(0.9, 1.1)
-            window[:, :, :3] *= scale
+        self.store = SharedMemoryFeatureStore(
+            list(lengths.keys()),
+            list(lengths.values()),
+            load=lambda sample_id: self._read_window(sample_id, 0, lengths[sample_id])
+        )
+        if self.derived_columns is not None:
+            self.derived_store = SharedMemoryFeatureStore(
+                list(lengths.keys()),
+                list(lengths.values()),
+                load=lambda sample_id: self._read_derived(sample_id, 0, lengths[sample_id]),
+                frame_shape=(len(self.derived_columns),)
+            )
+        self.cache = None
+        nbytes = self.store.nbytes + (self.derived_store.nbytes if self.derived_store is not None else 0)
+        print(f"  Preloaded {len(self.store)} samples into shared memory "
+              f"({nbytes / 2**20:.1f} MiB)")
+    
+    def _read_item(self, idx: int) -> np.ndarray:
+        """Frames of window idx as stored (from this epoch's variant when augmented offline)."""
+        sample_id, start, end, _ = self.window(idx)
+        if self.variants is not None and sample_id in self.variants:
+            variant = (self.epoch + int(self.windows['sample'][idx])) % self.variants.num_variants
+            return self.variants.read(sample_id, variant, start, end)
+        return self._read_window(sample_id, start, end)
+    
+    def _read_window(self, sample_id: str, start: int, end: int) -> np.ndarray:
+        """Return frames [start, end) of a sample as a [end - start, 75, 4] array."""
+        if self.store is not None:
+            return self.store.read(sample_id, start, end)
         
-        # Random translation
-        if np.random.rand() < 0.5:
-            translation = np.random.uniform(-0.1, 0.1, size=3)
-            window[:, :, :3] += translation
+        feature_path = self.features_dir / f"{sample_id}.npy"
+        if self.cache is not None:
+            # The cache holds encoded arrays, so a compact encoding also stretches its budget
+            features = self.cache.get(sample_id, lambda: np.load(feature_path))
+        else:
+            features = np.load(feature_path)  # [T, 75, 4]
+        return decode_features(features[start:end], self.encoding)
+    
+    def _read_derived(self, sample_id: str, start: int, end: int) -> np.ndarray:
+        """Selected derived channels of frames [start, end) as a [end - start, C] array."""
+        if self.derived_store is not None:
+            return self.derived_store.read(sample_id, start, end)
         
-        # Random temporal shift (circular shift)
-        if np.random.rand() < 0.3:
-            shift = np.random.randint(-5, 5)
-            window = np.roll(window, shift, axis=0)
+        derived_path = self.derived_dir / f"{sample_id}.npy"
+        if self.cache is not None:
+            # Shares the feature cache budget; only the selected columns are kept
+            derived = self.cache.get(f"{sample_id}/derived", lambda: np.ascontiguousarray(
+                np.load(derived_path, mmap_mode="r")[:, self.derived_columns]))
+            return derived[start:end]
+        derived = np.load(derived_path, mmap_mode="r")  # [T, C_stored]
+        return derived[start:end][:, self.derived_columns]
+    
+    def hand_coverage_report(self) -> pd.DataFrame:
+        """
+        Windows per class before the hand-coverage filter and how many fell below
+        min_hand_coverage (dropped, or down-weighted when low_coverage_weight > 0).
         
-        return window
+        Returns:
+            report: DataFrame (label, windows, low_coverage), one row per class present
+        """
+        if self._coverage_counts is None:
+            counts = np.bincount(self.windows['label'], minlength=self.num_classes)
+            low = np.zeros_like(counts)
+        else:
+            counts, low = self._coverage_counts
+        report = pd.DataFrame({'label': self.labels, 'windows': counts, 'low_coverage': low})
+        return report[report['windows'] > 0].reset_index(drop=True)
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Feature cache hit/miss/eviction counts summed over all workers."""
+        if self.cache is None:
+            return dict(hits=0, misses=0, evictions=0)
+        return self.cache.stats()
     
     def get_label_name(self, idx: int) -> str:
         """Convert label index to label name."""
@@ -176,17 +395,75 @@ class ASLDataset(Dataset):
         Compute class weights for handling imbalanced datasets.
         Returns inverse frequency weights.
         """
-        label_counts = np.zeros(self.num_classes)
-        for _, _, _, label_idx in self.windows:
-            label_counts[label_idx] += 1
+        label_counts = np.bincount(self.windows['label'], minlength=self.num_classes).astype(np.float64)
         
-        # Inverse frequency
-        weights = 1.0 / (label_counts + 1e-6)
-        weights = weights / weights.sum() * self.num_classes
+        # Inverse frequency (classes absent from this split get weight 0)
+        present = label_counts > 0
+        weights = np.zeros(self.num_classes)
+        weights[present] = 1.0 / label_counts[present]
+        if present.any():
+            weights = weights / weights.sum() * present.sum()
         
         return torch.from_numpy(weights).float()
 
 
+def create_datasets(
+    manifest_path: str,
+    features_dir: str,
+    strides: Dict[str, int],
+    labels: Optional[Sequence[str]] = None,
+    packed_dir: Optional[str] = None,
+    variants_dir: Optional[str] = None,
+    **dataset_kwargs
+) -> Dict[str, ASLDataset]:
+    """
+    Build one ASLDataset per split in a single indexing pass.
+    
+    The manifest is read once, every sample's length is looked up once, and
+    all splits share one label map, so a class index means the same class in
+    train, val and test.
+    
+    Args:
+        manifest_path: Path to manifest CSV
+        features_dir: Directory containing preprocessed .npy files
+        strides: Sliding-window stride per split, e.g. {'train': 16, 'val': 32}
+        labels: Global label list (e.g. config.yaml `labels`), extended by the
+            manifest labels it does not list; None uses the sorted labels
+            present in the whole manifest
+        packed_dir: Directory written by pack_features (opened once, shared)
+        variants_dir: Directory written by write_variants; used by the train
+            split only (evaluation always reads the original features)
+        **dataset_kwargs: Passed on to every ASLDataset
+    
+    Returns:
+        datasets: {split: ASLDataset}
+    """
+    df = pd.read_csv(manifest_path)
+    store = PackedFeatureStore(packed_dir) if packed_dir is not None else None
+    
+    ids = df['id'].astype(str).tolist()
+    if store is not None:
+        df['feature_length'] = [store.length(i) if i in store else -1 for i in ids]
+    else:
+        df['feature_length'] = lookup_lengths(features_dir, ids)
+    
+    labels = build_label_list(df['label'], labels)
+    
+    return {
+        split: ASLDataset(
+            manifest_path=df,
+            features_dir=features_dir,
+            stride=stride,
+            split=split,
+            labels=labels,
+            packed_dir=store,
+            variants_dir=variants_dir if split == 'train' else None,
+            **dataset_kwargs
+        )
+        for split, stride in strides.items()
+    }
+
+
 def create_dataloaders(
     config_path: str = "configs/config.yaml",
     window_size: int = 32,
@@ -194,7 +471,18 @@ def create_dataloaders(
     stride_val: int = 32,
     batch_size: int = 32,
     num_workers: int = 4,
-    augment_train: bool = True
+    augment_train: bool = True,
+    packed: bool = False,
+    seed: int = 42,
+    cache_bytes: int = 0,
+    bucket_by_length: bool = False,
+    preload: bool = False,
+    streaming: bool = False,
+    shuffle_buffer: int = 4096,
+    offline_augment: bool = False,
+    derived_channels: Optional[Sequence[str]] = None,
+    min_hand_coverage: float = 0.0,
+    low_coverage_weight: float = 0.0
 ) -> Tuple[DataLoader, DataLoader, DataLoader]:
     """
     Create train, val, test dataloaders from config.
@@ -206,7 +494,35 @@ def create_dataloaders(
         stride_val: Stride for val/test (typically = window_size for no overlap)
         batch_size: Batch size
         num_workers: Number of worker processes for data loading
-        augment_train: Apply augmentation to training data
+        augment_train: Apply batch augmentation to training data
+        packed: Read windows from the packed store in artifacts/features_packed/
+            (build it with scripts/2_preprocessing/pack_features.py)
+        seed: Seed for training shuffle order and augmentation
+        cache_bytes: Per-worker LRU cache budget for decoded samples (0 disables);
+            most effective for the sequentially read val/test loaders
+        bucket_by_length: Group windows by real length and pad each batch only to
+            its longest window; batches are then (features, labels, mask)
+        preload: Load each split once into shared memory and let all workers
+            read from it (use when the feature set fits in RAM)
+        streaming: Use StreamingASLDataset over the packed shards (implies packed;
+            for corpora larger than RAM). Call train_loader.dataset.set_epoch(epoch)
+            to reshuffle shards each epoch
+        shuffle_buffer: Window shuffle buffer size of the streaming train loader
+        offline_augment: Read training windows from the precomputed variants in
+            artifacts/features_aug/ (build them with
+            scripts/2_preprocessing/augment_features.py) instead of rotating,
+            scaling and translating every batch. The temporal shift depends on
+            the window, so with augment_train it still runs per batch. Call
+            train_loader.dataset.set_epoch(epoch) to move to the next variant
+        derived_channels: Also load these precomputed derived channels from
+            artifacts/features_derived/ (preprocess_features.py --derived);
+            batches then end with a [B, W, C] derived tensor, augmented
+            together with the features (not available with offline_augment)
+        min_hand_coverage: Drop (or down-weight) windows of every split in which
+            fewer than this fraction of frames have a tracked hand (0 disables)
+        low_coverage_weight: 0 drops those windows; > 0 keeps them and samples
+            training windows with replacement in proportion to this weight
+            (val/test keep them at full weight)
     
     Returns:
         train_loader, val_loader, test_loader
@@ -217,59 +533,134 @@ def create_dataloaders(
     
     manifest_path = cfg['manifest_out']
     features_dir = Path(cfg['artifacts_root']) / 'features'
+    packed_dir = Path(cfg['artifacts_root']) / 'features_packed' if packed or streaming else None
     
-    # Create datasets
-    train_dataset = ASLDataset(
-        manifest_path=manifest_path,
-        features_dir=features_dir,
-        window_size=window_size,
-        stride=stride_train,
-        split='train',
-        augment=augment_train
-    )
+    variants_dir = Path(cfg['artifacts_root']) / 'features_aug' if offline_augment else None
     
-    val_dataset = ASLDataset(
-        manifest_path=manifest_path,
-        features_dir=features_dir,
-        window_size=window_size,
-        stride=stride_val,
-        split='val',
-        augment=False
-    )
+    strides = {'train': stride_train, 'val': stride_val, 'test': stride_val}
+    
+    if offline_augment and derived_channels:
+        # Variants store augmented features only; their derived channels would not match
+        raise ValueError("offline_augment cannot be combined with derived_channels")
+    
+    if streaming:
+        if bucket_by_length or preload or offline_augment or derived_channels or min_hand_coverage > 0:
+            raise ValueError("streaming cannot be combined with bucket_by_length, preload, offline_augment, "
+                             "derived_channels or min_hand_coverage")
+        
+        # Shards are read sequentially; only the train split is shuffled (through the buffer)
+        df = pd.read_csv(manifest_path, dtype={'id': str})
+        labels = build_label_list(df['label'], cfg['labels'])  # one class list for all splits
+        loaders = []
+        for split, stride in strides.items():
+            dataset = StreamingASLDataset(
+                manifest_path=df,
+                packed_dir=packed_dir,
+                window_size=window_size,
+                stride=stride,
+                split=split,
+                labels=labels,
+                shuffle_buffer=shuffle_buffer if split == 'train' else 0,
+                seed=seed
+            )
+            augment = split == 'train' and augment_train
+            loaders.append(DataLoader(
+                dataset,
+                batch_size=batch_size,
+                num_workers=num_workers,
+                pin_memory=True,
+                drop_last=(split == 'train'),
+                collate_fn=AugmentCollate(BatchAugment(seed=seed)) if augment else default_collate
+            ))
+        return tuple(loaders)
     
-    test_dataset = ASLDataset(
+    # Create datasets (one manifest read and length lookup for all splits)
+    datasets = create_datasets(
         manifest_path=manifest_path,
         features_dir=features_dir,
+        strides=strides,
+        labels=cfg['labels'],
+        packed_dir=packed_dir,
+        variants_dir=variants_dir,
+        derived_dir=Path(cfg['artifacts_root']) / 'features_derived' if derived_channels else None,
+        derived_channels=derived_channels,
         window_size=window_size,
-        stride=stride_val,
-        split='test',
-        augment=False
+        min_hand_coverage=min_hand_coverage,
+        low_coverage_weight=low_coverage_weight,
+        cache_bytes=cache_bytes,
+        pad_to_window=not bucket_by_length,
+        preload=preload
     )
+    train_dataset, val_dataset, test_dataset = datasets['train'], datasets['val'], datasets['test']
+    
+    # Down-weighted low-coverage windows are sampled in proportion to their weight
+    weighted = min_hand_coverage > 0 and low_coverage_weight > 0
+    if weighted and bucket_by_length:
+        raise ValueError("low_coverage_weight cannot be combined with bucket_by_length; use 0 to drop windows")
     
     # Create dataloaders
+    if bucket_by_length:
+        # Batches of similar-length windows padded to their longest item, plus a validity mask
+        collate = collate_padded
+        batching = {
+            split: dict(batch_sampler=LengthBucketBatchSampler(
+                dataset.window_lengths(),
+                batch_size,
+                shuffle=(split == 'train'),
+                drop_last=(split == 'train'),
+                seed=seed
+            ))
+            for split, dataset in [('train', train_dataset), ('val', val_dataset), ('test', test_dataset)]
+        }
+    else:
+        collate = default_collate
+        train_sampling = dict(shuffle=True)
+        if weighted:
+            train_sampling = dict(sampler=WeightedRandomSampler(
+                torch.from_numpy(train_dataset.window_weights),
+                num_samples=len(train_dataset),
+                replacement=True,
+                generator=torch.Generator().manual_seed(seed)
+            ))
+        batching = {
+            'train': dict(batch_size=batch_size, drop_last=True,
+                          generator=torch.Generator().manual_seed(seed), **train_sampling),
+            'val': dict(batch_size=batch_size, shuffle=False),
+            'test': dict(batch_size=batch_size, shuffle=False)
+        }
+    
+    # Training augmentation runs once per collated batch; the seeded generator makes
+    # the shuffle order and per-worker/per-epoch augmentation seeds reproducible.
+    # Offline variants carry only the affine part, so the temporal shift (which depends
+    # on the window) still runs per batch.
+    if augment_train and offline_augment:
+        train_collate = AugmentCollate(BatchAugment(p_rotation=0, p_scale=0, p_translation=0, seed=seed), collate)
+    elif augment_train:
+        train_collate = AugmentCollate(BatchAugment(seed=seed, derived_channels=derived_channels or ()), collate)
+    else:
+        train_collate = collate
     train_loader = DataLoader(
         train_dataset,
-        batch_size=batch_size,
-        shuffle=True,
         num_workers=num_workers,
         pin_memory=True,
-        drop_last=True
+        collate_fn=train_collate,
+        **batching['train']
     )
     
     val_loader = DataLoader(
         val_dataset,
-        batch_size=batch_size,
-        shuffle=False,
         num_workers=num_workers,
-        pin_memory=True
+        pin_memory=True,
+        collate_fn=collate,
+        **batching['val']
     )
     
     test_loader = DataLoader(
         test_dataset,
-        batch_size=batch_size,
-        shuffle=False,
         num_workers=num_workers,
-        pin_memory=True
+        pin_memory=True,
+        collate_fn=collate,
+        **batching['test']
     )
     
     return train_loader, val_loader, test_loader
@@ -0,0 +1,128 @@
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+ENCODING_FILE = "encoding.json"
+ENCODINGS = ("float32", "float16", "int16")
+
+# Largest int16 code used; symmetric so that 0.0 (missing landmark) encodes exactly
+INT16_MAX = 32767
+
+
+def make_encoding(dtype: str = "float32", coord_range: float = 8.0) -> Dict:
+    """
+    Describe an on-disk feature encoding.
+
+    float16 halves feature bytes. int16 stores per-channel quantized codes,
+    decoded as code * scale + offset: x, y, z cover [-coord_range, coord_range]
+    (torso-normalized units, values beyond are clipped) and visibility covers
+    [0, 1].
+
+    Args:
+        dtype: One of ENCODINGS
+        coord_range: Maximum absolute x, y, z value representable by int16
+    Returns:
+        encoding: JSON-serializable dict
+    """
+    if dtype not in ENCODINGS:
+        raise ValueError(f"Unknown feature encoding '{dtype}', expected one of {ENCODINGS}")
+    encoding = {"dtype": dtype}
+    if dtype == "int16":
+        encoding["coord_range"] = float(coord_range)
+        encoding["scale"] = [coord_range / INT16_MAX] * 3 + [1.0 / INT16_MAX]
+        encoding["offset"] = [0.0] * 4
+    return encoding
+
+
+def load_encoding(features_dir: str) -> Optional[Dict]:
+    """Encoding of a feature directory (None if it has no encoding.json, i.e. float32)."""
+    path = Path(features_dir) / ENCODING_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_encoding(features_dir: str, encoding: Dict) -> None:
+    path = Path(features_dir) / ENCODING_FILE
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(encoding, indent=2))
+    tmp_path.replace(path)
+
+
+def init_encoding(features_dir: str, dtype: Optional[str] = None, coord_range: float = 8.0,
+                  overwrite: bool = False) -> Dict:
+    """
+    Encoding a preprocessing run should write with.
+
+    A directory keeps one encoding, so a resumed run reuses the stored int16
+    scale/offset. dtype None keeps whatever the directory holds (float32 for
+    a new one); explicitly asking for a different encoding than the stored
+    one is an error unless every file is being rewritten (overwrite).
+    """
+    existing = load_encoding(features_dir)
+    if dtype is None:
+        if existing is not None:
+            return existing
+        dtype = "float32"
+    elif existing is not None and not overwrite:
+        if existing["dtype"] != dtype:
+            raise ValueError(f"{features_dir} already holds {existing['dtype']} features; "
+                             f"rewrite all of them to switch to {dtype}")
+        return existing
+
+    encoding = make_encoding(dtype, coord_range)
+    save_encoding(features_dir, encoding)
+    return encoding
+
+
+def encode_features(features: np.ndarray, encoding: Optional[Dict]) -> np.ndarray:
+    """
+    Encode float32 [T, 75, 4] features for storage.
+
+    Returns:
+        encoded: float32, float16 or int16 array of the same shape
+    """
+    dtype = encoding["dtype"] if encoding is not None else "float32"
+    if dtype == "float32":
+        return features.astype(np.float32, copy=False)
+    if dtype == "float16":
+        return features.astype(np.float16)
+
+    scale = np.asarray(encoding["scale"], dtype=np.float32)
+    offset = np.asarray(encoding["offset"], dtype=np.float32)
+    codes = np.rint((features - offset) / scale)
+    return np.clip(codes, -INT16_MAX, INT16_MAX).astype(np.int16)
+
+
+def decode_features(features: np.ndarray, encoding: Optional[Dict] = None) -> np.ndarray:
+    """
+    Decode stored features to float32.
+
+    Decoding follows the array's dtype, so directories mixing float32 files
+    with encoded ones read correctly; int16 needs the directory's encoding.
+    float32 input is returned as is (no copy).
+    """
+    if features.dtype == np.float32:
+        return features
+    if features.dtype == np.int16:
+        if encoding is None or "scale" not in encoding:
+            raise ValueError("int16 features need the scale/offset from encoding.json")
+        scale = np.asarray(encoding["scale"], dtype=np.float32)
+        offset = np.asarray(encoding["offset"], dtype=np.float32)
+        return features * scale + offset
+    return features.astype(np.float32)
+
+
+def reconstruction_error(features: np.ndarray, encoded: np.ndarray, encoding: Optional[Dict]) -> Tuple[float, float]:
+    """
+    Error introduced by an encoding on one sample.
+
+    Returns:
+        max_abs: Largest absolute difference after decoding
+        sq_sum: Sum of squared differences (for an RMSE over many samples)
+    """
+    diff = decode_features(encoded, encoding).astype(np.float64) - features
+    if diff.size == 0:
+        return 0.0, 0.0
+    return float(np.abs(diff).max()), float(np.square(diff).sum())
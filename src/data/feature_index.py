@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Mapping
+
+from src.preprocessing.landmarks import FEATURE_LEFT_HAND, FEATURE_RIGHT_HAND
+
+LENGTHS_FILE = "lengths.csv"
+
+
+def _load_table(features_dir: str, file_name: str, column: str, dtype: type) -> Dict:
+    """Load a persisted id → value table (empty if it has not been written yet)."""
+    path = Path(features_dir) / file_name
+    if not path.exists():
+        return {}
+    table = pd.read_csv(path, dtype={"id": str, column: dtype}, keep_default_na=False)
+    return dict(zip(table["id"], table[column].astype(dtype).tolist()))
+
+
+def _update_table(features_dir: str, file_name: str, column: str, dtype: type, entries: Mapping) -> None:
+    """Merge id → value entries into a persisted table, rewritten atomically and sorted by id."""
+    if not entries:
+        return
+    merged = _load_table(features_dir, file_name, column, dtype)
+    merged.update({k: dtype(v) for k, v in entries.items()})
+
+    path = Path(features_dir) / file_name
+    tmp_path = path.with_suffix(".csv.tmp")
+    table = pd.DataFrame({"id": list(merged.keys()), column: list(merged.values())})
+    table.sort_values("id").to_csv(tmp_path, index=False)
+    tmp_path.replace(path)
+
+
+def read_npy_length(path: Path) -> int:
+    """
+    Read the number of frames of a .npy file from its header only.
+
+    Returns:
+        T: first dimension of the stored array
+    """
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, _ = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, _, _ = np.lib.format.read_array_header_2_0(f)
+    return int(shape[0]) if shape else 0
+
+
+def load_lengths(features_dir: str) -> Dict[str, int]:
+    """Load the persisted id → T table (empty if it has not been written yet)."""
+    return _load_table(features_dir, LENGTHS_FILE, "length", int)
+
+
+def update_lengths(features_dir: str, lengths: Mapping[str, int]) -> None:
+    """
+    Merge new id → T entries into the persisted length table.
+
+    Called by preprocessing after writing feature files so the dataloader
+    never has to open them just to learn their length.
+    """
+    _update_table(features_dir, LENGTHS_FILE, "length", int, lengths)
+
+
+def lookup_lengths(features_dir: str, ids: Iterable[str]) -> np.ndarray:
+    """
+    Sequence length of every requested sample.
+
+    Uses the persisted length table and falls back to reading the .npy header
+    for ids it does not cover, so the cost is O(len(ids)) and never
+    O(total feature bytes). Every feature file is still checked for
+    existence (one stat per id), so table entries of deleted files are
+    reported as missing.
+
+    Returns:
+        lengths: int64 array aligned with ids (-1 where the feature file is missing)
+    """
+    features_dir = Path(features_dir)
+    table = load_lengths(features_dir)
+
+    lengths = []
+    for sample_id in ids:
+        feature_path = features_dir / f"{sample_id}.npy"
+        if not feature_path.exists():
+            lengths.append(-1)
+            continue
+        T = table.get(sample_id)
+        if T is None:
+            T = read_npy_length(feature_path)
+        lengths.append(T)
+    return np.asarray(lengths, dtype=np.int64)
+
+
+# Per-frame hand presence, stored as a bitmap per sample next to the lengths
+HANDS_FILE = "hands.csv"
+
+
+def hand_presence(features: np.ndarray) -> np.ndarray:
+    """
+    Frames in which at least one hand is tracked (any hand point with visibility > 0).
+
+    Args:
+        features: [T, 75, 4] features (float32 or encoded; visibility stays > 0 when encoded)
+    Returns:
+        present: [T] bool
+    """
+    return np.any(features[:, FEATURE_LEFT_HAND.start:FEATURE_RIGHT_HAND.stop, 3] > 0, axis=1)
+
+
+def pack_presence(present: np.ndarray) -> str:
+    """[T] bool → hex bitmap (T / 4 characters)."""
+    return np.packbits(np.asarray(present, dtype=bool)).tobytes().hex()
+
+
+def unpack_presence(bitmap: str, length: int) -> np.ndarray:
+    """Hex bitmap → [length] bool."""
+    bits = np.unpackbits(np.frombuffer(bytes.fromhex(bitmap), dtype=np.uint8))
+    return bits[:length].astype(bool)
+
+
+def load_hand_presence(features_dir: str) -> Dict[str, str]:
+    """Load the persisted id → hex bitmap table (empty if it has not been written yet)."""
+    return _load_table(features_dir, HANDS_FILE, "hands", str)
+
+
+def update_hand_presence(features_dir: str, bitmaps: Mapping[str, str]) -> None:
+    """
+    Merge new id → hex bitmap entries (see pack_presence) into the persisted table.
+
+    Written by preprocessing together with the lengths, so window pruning
+    never has to open feature files.
+    """
+    _update_table(features_dir, HANDS_FILE, "hands", str, bitmaps)
+
+
+def lookup_hand_presence(features_dir: str, ids: Iterable[str], lengths: Iterable[int]) -> np.ndarray:
+    """
+    Concatenated per-frame hand presence of the requested samples.
+
+    Uses the persisted bitmap table and falls back to the feature file's
+    visibility channel for ids it does not cover. Frames of samples without
+    either are counted as present (never pruned).
+
+    Returns:
+        present: [sum(lengths)] bool, sample after sample in ids order
+    """
+    features_dir = Path(features_dir)
+    table = load_hand_presence(features_dir)
+
+    parts = []
+    for sample_id, T in zip(ids, lengths):
+        T = max(int(T), 0)
+        bitmap = table.get(sample_id)
+        if bitmap is not None:
+            parts.append(unpack_presence(bitmap, T))
+            continue
+        feature_path = features_dir / f"{sample_id}.npy"
+        if feature_path.exists():
+            parts.append(hand_presence(np.load(feature_path, mmap_mode="r")[:T]))
+        else:
+            parts.append(np.ones(T, dtype=bool))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=bool)
+
+
+# Effective sampling rate (frames per second) of the stored frames, written by extraction
+FPS_FILE = "fps.csv"
+
+
+def load_fps(features_dir: str) -> Dict[str, float]:
+    """Load the persisted id → fps table (empty if it has not been written yet)."""
+    return _load_table(features_dir, FPS_FILE, "fps", float)
+
+
+def update_fps(features_dir: str, fps: Mapping[str, float]) -> None:
+    """
+    Merge new id → fps entries into the persisted table.
+
+    The rate is the one of the stored frames (after any frame sampling), so
+    frame offsets convert to seconds as t / fps; 0 means unknown (or a
+    still image).
+    """
+    _update_table(features_dir, FPS_FILE, "fps", float, fps)
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+import shutil
+import torch
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from src.data.encoding import ENCODING_FILE, decode_features, encode_features, load_encoding
+
+INDEX_FILE = "index.csv"
+SHARD_TEMPLATE = "shard_{:05d}.npy"
+
+
+def pack_features(
+    features_dir: str,
+    out_dir: str,
+    ids: Optional[Iterable[str]] = None,
+    shard_bytes: int = 1 << 30
+) -> pd.DataFrame:
+    """
+    Pack per-sample feature files into contiguous shard files.
+
+    Each shard is a single [N_frames, 75, 4] .npy array holding the frames of
+    many samples back to back. The index records where every sample lives.
+    Shards keep the encoding of features_dir (encoding.json is copied along).
+
+    Args:
+        features_dir: Directory containing preprocessed {id}.npy files
+        out_dir: Output directory for shards and index.csv
+        ids: Sample ids to pack (None packs every .npy in features_dir)
+        shard_bytes: Approximate maximum size of one shard file
+    Returns:
+        index: DataFrame with columns (id, shard, offset, length)
+    """
+    features_dir = Path(features_dir)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Remove shards from a previous pack so the directory matches the index
+    for old in out_dir.glob("shard_*.npy"):
+        old.unlink()
+
+    if ids is None:
+        ids = sorted(p.stem for p in features_dir.glob("*.npy"))
+    
+    encoding = load_encoding(features_dir)
+    (out_dir / ENCODING_FILE).unlink(missing_ok=True)
+    if encoding is not None:
+        shutil.copyfile(features_dir / ENCODING_FILE, out_dir / ENCODING_FILE)
+
+    rows = []
+    pending = []
+    pending_bytes = 0
+    shard = 0
+    offset = 0
+
+    def flush():
+        nonlocal pending, pending_bytes, shard, offset
+        if pending:
+            np.save(out_dir / SHARD_TEMPLATE.format(shard), np.concatenate(pending, axis=0))
+            shard += 1
+        pending, pending_bytes, offset = [], 0, 0
+
+    for sample_id in ids:
+        feature_path = features_dir / f"{sample_id}.npy"
+        if not feature_path.exists():
+            continue
+
+        features = np.load(feature_path)  # [T, 75, 4]
+        if len(features) == 0:
+            continue
+        if encoding is not None and features.dtype != np.dtype(encoding["dtype"]):
+            # Files written before the directory's encoding changed
+            features = encode_features(decode_features(features, encoding), encoding)
+        if pending and pending_bytes + features.nbytes > shard_bytes:
+            flush()
+
+        rows.append((sample_id, shard, offset, len(features)))
+        pending.append(features)
+        pending_bytes += features.nbytes
+        offset += len(features)
+    flush()
+
+    index = pd.DataFrame(rows, columns=["id", "shard", "offset", "length"])
+    index.to_csv(out_dir / INDEX_FILE, index=False)
+    return index
+
+
+class PackedFeatureStore:
+    """
+    Read-only view over shards written by pack_features.
+
+    Shards are opened lazily as np.memmap in each process, so the store can be
+    handed to DataLoader workers without copying feature data. Encoded
+    (float16 / int16) shards are decoded to float32 per read.
+    """
+
+    def __init__(self, store_dir: str):
+        """
+        Args:
+            store_dir: Directory containing index.csv and shard_*.npy files
+        """
+        self.store_dir = Path(store_dir)
+        index = pd.read_csv(self.store_dir / INDEX_FILE, dtype={"id": str})
+
+        self.ids = index["id"].to_numpy()
+        self.shards = index["shard"].to_numpy(dtype=np.int64)
+        self.offsets = index["offset"].to_numpy(dtype=np.int64)
+        self.lengths = index["length"].to_numpy(dtype=np.int64)
+        self.position = {sample_id: i for i, sample_id in enumerate(self.ids)}
+        self.encoding = load_encoding(self.store_dir)
+
+        self._shards: Dict[int, np.ndarray] = {}
+
+    def __getstate__(self):
+        # Never pickle open memmaps; each worker reopens its own
+        state = self.__dict__.copy()
+        state["_shards"] = {}
+        return state
+
+    def __contains__(self, sample_id: str) -> bool:
+        return sample_id in self.position
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def length(self, sample_id: str) -> int:
+        """Number of frames stored for a sample."""
+        return int(self.lengths[self.position[sample_id]])
+
+    def _shard(self, shard: int) -> np.ndarray:
+        if shard not in self._shards:
+            path = self.store_dir / SHARD_TEMPLATE.format(shard)
+            self._shards[shard] = np.load(path, mmap_mode="r")
+        return self._shards[shard]
+
+    def read(self, sample_id: str, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """
+        Slice frames [start, end) of a sample without copying (float32 shards).
+
+        Returns:
+            features: read-only [end - start, 75, 4] view into the shard, or a
+                decoded float32 copy for encoded shards
+        """
+        i = self.position[sample_id]
+        length = int(self.lengths[i])
+        end = length if end is None else min(end, length)
+        offset = int(self.offsets[i])
+        frames = self._shard(int(self.shards[i]))[offset + start:offset + end]
+        return decode_features(frames, self.encoding)
+
+
+class SharedMemoryFeatureStore:
+    """
+    Frames of a set of samples preloaded into one shared-memory tensor.
+
+    Built once in the main process; DataLoader workers inherit (fork) or
+    receive (spawn) a handle to the same memory and read windows from it with
+    zero copies, instead of each worker reading the files through the page
+    cache.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        lengths: Sequence[int],
+        load: Callable[[str], np.ndarray],
+        frame_shape: Tuple[int, ...] = (75, 4)
+    ):
+        """
+        Args:
+            ids: Sample ids to preload
+            lengths: Number of frames of each sample (aligned with ids)
+            load: Function returning the [T, 75, 4] array of a sample id
+            frame_shape: Shape of one frame
+        """
+        self.ids = np.asarray(ids, dtype=object)
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.offsets = np.cumsum(self.lengths) - self.lengths
+        self.position = {sample_id: i for i, sample_id in enumerate(self.ids)}
+
+        self.data = torch.empty((int(self.lengths.sum()),) + tuple(frame_shape), dtype=torch.float32)
+        self.data.share_memory_()
+        frames = self.data.numpy()
+        for sample_id, offset, length in zip(self.ids, self.offsets, self.lengths):
+            frames[offset:offset + length] = load(sample_id)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.numel() * self.data.element_size()
+
+    def __contains__(self, sample_id: str) -> bool:
+        return sample_id in self.position
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def length(self, sample_id: str) -> int:
+        """Number of frames stored for a sample."""
+        return int(self.lengths[self.position[sample_id]])
+
+    def read(self, sample_id: str, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """
+        Slice frames [start, end) of a sample without copying.
+
+        Returns:
+            features: read-only [end - start, 75, 4] view into shared memory
+        """
+        i = self.position[sample_id]
+        length = int(self.lengths[i])
+        end = length if end is None else min(end, length)
+        offset = int(self.offsets[i])
+        window = self.data[offset + start:offset + end].numpy()
+        window.flags.writeable = False
+        return window
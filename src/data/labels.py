@@ -0,0 +1,32 @@
+from typing import Iterable, List, Optional, Sequence
+
+
+def normalize_label(label: str) -> str:
+    """Normalize a label the way build_manifest.py does (e.g. 'Thank You' → 'thank_you')."""
+    return str(label).strip().lower().replace(" ", "_")
+
+
+def build_label_list(manifest_labels: Iterable[str], labels: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Resolve the ordered class list.
+
+    The configured labels keep their order as a prefix; manifest labels not
+    listed there (e.g. the Kaggle `nothing` negative class, or MS-ASL classes
+    backfilled by msasl_make_list.py) follow in sorted order. Build it once
+    from the whole manifest and share it across splits, so class indices
+    agree between them.
+
+    Args:
+        manifest_labels: Labels occurring in the manifest rows being indexed
+        labels: Global label list (e.g. config.yaml `labels`); None uses the
+            sorted labels present in manifest_labels
+    Returns:
+        labels: list whose positions are the class indices
+    """
+    present = set(manifest_labels)
+    if labels is None:
+        return sorted(present)
+
+    labels = [normalize_label(label) for label in labels]
+    return labels + sorted(present - set(labels))
+
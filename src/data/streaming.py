@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+import torch
+import torch.distributed as dist
+from pathlib import Path
+from torch.utils.data import IterableDataset, get_worker_info
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.data.encoding import decode_features, load_encoding
+from src.data.feature_store import INDEX_FILE, SHARD_TEMPLATE
+from src.data.labels import build_label_list
+
+
+def window_bounds(T: int, window_size: int, stride: int) -> List[Tuple[int, int]]:
+    """
+    (start, end) frame bounds of the sliding windows over a T-frame sequence.
+    Sequences shorter than window_size give one short window (padded later).
+    """
+    if T < window_size:
+        return [(0, T)]
+    return [(start, start + window_size) for start in range(0, T - window_size + 1, stride)]
+
+
+class StreamingASLDataset(IterableDataset):
+    """
+    Streaming variant of ASLDataset over packed feature shards.
+
+    Reads shards written by pack_features sequentially, generates windows on
+    the fly and mixes them through a bounded shuffle buffer, so neither random
+    access nor an in-memory window list is needed. Every DataLoader worker of
+    every distributed rank reads one contiguous run of the epoch's shard
+    order, cut at sample boundaries so all of them get about the same number
+    of frames, however few shards there are.
+    """
+
+    def __init__(
+        self,
+        manifest_path: Union[str, pd.DataFrame],
+        packed_dir: str,
+        window_size: int = 32,
+        stride: int = 16,
+        split: Optional[str] = None,
+        source_filter: Optional[List[str]] = None,
+        labels: Optional[Sequence[str]] = None,
+        shuffle_buffer: int = 1024,
+        seed: int = 0,
+        pad_to_window: bool = True
+    ):
+        """
+        Args:
+            manifest_path: Path to manifest CSV, or an already loaded DataFrame
+            packed_dir: Directory written by pack_features
+            window_size: Number of frames per window
+            stride: Stride for sliding window
+            split: Filter by split ('train', 'val', 'test', None for all)
+            source_filter: Filter by source (e.g., ['kaggle', 'msasl'])
+            labels: Global label list defining class indices; None uses the
+                sorted labels present in this dataset
+            shuffle_buffer: Size of the window shuffle buffer (0 keeps shard order
+                and disables shard shuffling)
+            seed: Base seed for shard order and buffer shuffling (see set_epoch)
+            pad_to_window: Zero-pad short windows to window_size
+        """
+        self.packed_dir = Path(packed_dir)
+        self.window_size = window_size
+        self.stride = stride
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.pad_to_window = pad_to_window
+        self.encoding = load_encoding(self.packed_dir)
+        self.epoch = 0
+
+        # Load manifest
+        if isinstance(manifest_path, pd.DataFrame):
+            df = manifest_path
+        else:
+            df = pd.read_csv(manifest_path, dtype={'id': str})
+        if split is not None:
+            df = df[df['split'] == split]
+        if source_filter is not None:
+            df = df[df['source'].isin(source_filter)]
+
+        # Build label mapping
+        self.labels = build_label_list(df['label'], labels)
+        self.label_to_idx = {label: idx for idx, label in enumerate(self.labels)}
+        self.idx_to_label = {idx: label for label, idx in self.label_to_idx.items()}
+        self.num_classes = len(self.labels)
+
+        # Keep only the index rows of this split, grouped by shard in on-disk order
+        index = pd.read_csv(self.packed_dir / INDEX_FILE, dtype={'id': str})
+        index = index.merge(df[['id', 'label']], on='id')
+        index['label_idx'] = index['label'].map(self.label_to_idx)
+        index = index.sort_values(['shard', 'offset'])
+        self.shards = {
+            int(shard): rows[['id', 'offset', 'length', 'label_idx']].to_numpy()
+            for shard, rows in index.groupby('shard')
+        }
+        self.num_samples = len(index)
+
+        print(f"StreamingASLDataset initialized:")
+        print(f"  Split: {split if split else 'all'}")
+        print(f"  Samples: {self.num_samples}")
+        print(f"  Shards: {len(self.shards)}")
+        print(f"  Classes: {self.num_classes}")
+        print(f"  Window size: {self.window_size}, Stride: {self.stride}")
+
+    def set_epoch(self, epoch: int) -> None:
+        """Change shard order and shuffling for a new epoch."""
+        self.epoch = epoch
+
+    def get_label_name(self, idx: int) -> str:
+        """Convert label index to label name."""
+        return self.idx_to_label[idx]
+
+    def _assigned_rows(self) -> List[Tuple[int, np.ndarray]]:
+        """
+        (shard, index rows) read by this (rank, worker), in this epoch's order.
+
+        All readers walk the same shard order (permuted per epoch when
+        shuffling) and each takes a contiguous run of it, so reads stay
+        sequential; a sample goes to the reader whose share of the total
+        frames contains its middle frame.
+        """
+        rank, world_size = 0, 1
+        if dist.is_available() and dist.is_initialized():
+            rank, world_size = dist.get_rank(), dist.get_world_size()
+        info = get_worker_info()
+        worker_id, num_workers = (info.id, info.num_workers) if info is not None else (0, 1)
+        reader, num_readers = rank * num_workers + worker_id, world_size * num_workers
+
+        shards = sorted(self.shards)
+        if self.shuffle_buffer > 0:
+            # Same permutation on every rank/worker, then disjoint contiguous runs
+            shards = list(np.random.default_rng((self.seed, self.epoch)).permutation(shards))
+        if not shards:
+            return []
+        lengths = np.concatenate([self.shards[shard][:, 2] for shard in shards]).astype(np.int64)
+        ends = np.cumsum(lengths)
+        total = max(int(ends[-1]), 1)
+        owner = np.minimum((2 * ends - lengths) * num_readers // (2 * total), num_readers - 1)
+
+        assigned, start = [], 0
+        for shard in shards:
+            rows = self.shards[shard]
+            mine = rows[owner[start:start + len(rows)] == reader]
+            start += len(rows)
+            if len(mine):
+                assigned.append((shard, mine))
+        return assigned
+
+    def _windows(self, shard: int, rows: np.ndarray) -> Iterator[Tuple[torch.Tensor, int]]:
+        frames = np.load(self.packed_dir / SHARD_TEMPLATE.format(shard), mmap_mode='r')
+        for _, offset, length, label_idx in rows:
+            # One sequential read per sample, windows are sliced from memory
+            features = decode_features(np.asarray(frames[offset:offset + length]), self.encoding)
+            for start, end in window_bounds(int(length), self.window_size, self.stride):
+                window = features[start:end]
+                length_out = self.window_size if self.pad_to_window else len(window)
+                padded = np.zeros((length_out,) + window.shape[1:], dtype=np.float32)
+                padded[:len(window)] = window
+                yield torch.from_numpy(padded), int(label_idx)
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, int]]:
+        info = get_worker_info()
+        worker_id = info.id if info is not None else 0
+        rank = dist.get_rank() if dist.is_available() and dist.is_initialized() else 0
+        rng = np.random.default_rng((self.seed, self.epoch, rank, worker_id))
+
+        buffer = []
+        for shard, rows in self._assigned_rows():
+            for item in self._windows(shard, rows):
+                if self.shuffle_buffer <= 0:
+                    yield item
+                    continue
+                if len(buffer) < self.shuffle_buffer:
+                    buffer.append(item)
+                    continue
+                # Emit a random buffered window and keep the new one in its place
+                i = rng.integers(len(buffer))
+                buffer[i], item = item, buffer[i]
+                yield item
+
+        rng.shuffle(buffer)
+        yield from buffer
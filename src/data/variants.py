@@ -0,0 +1,179 @@
+import json
+import zlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from src.data.encoding import ENCODING_FILE, decode_features, encode_features, load_encoding, save_encoding
+from src.utils.fingerprint import append_fingerprints, compact_fingerprints, file_identity, fingerprint, stale_ids
+from src.utils.io import atomic_save_npy
+
+AUGMENT_FILE = "augment.json"
+PARAMS_FILE = "params.csv"
+
+
+def draw_variant_params(
+    sample_ids: Iterable[str],
+    num_variants: int,
+    seed: int = 0,
+    rotation_deg: float = 15.0,
+    p_rotation: float = 0.5,
+    scale_range: Tuple[float, float] = (0.9, 1.1),
+    p_scale: float = 0.5,
+    translation: float = 0.1,
+    p_translation: float = 0.5
+) -> pd.DataFrame:
+    """
+    Draw the affine parameters of num_variants augmented copies per sample.
+
+    Same distributions as the online BatchAugment (yaw rotation, scale,
+    translation, each applied with its probability). Every sample has its own
+    generator seeded from (seed, crc32(id)), so its parameters do not depend
+    on which other samples are processed.
+
+    Returns:
+        params: DataFrame (id, variant, rotation_deg, scale, tx, ty, tz)
+    """
+    frames = []
+    for sample_id in sample_ids:
+        rng = np.random.default_rng([seed, zlib.crc32(str(sample_id).encode())])
+        K = num_variants
+
+        angle = np.where(rng.random(K) < p_rotation, rng.uniform(-rotation_deg, rotation_deg, K), 0.0)
+        scale = np.where(rng.random(K) < p_scale, rng.uniform(*scale_range, K), 1.0)
+        shift = np.where((rng.random(K) < p_translation)[:, None], rng.uniform(-translation, translation, (K, 3)), 0.0)
+
+        frames.append(pd.DataFrame({
+            "id": sample_id, "variant": np.arange(K), "rotation_deg": angle, "scale": scale,
+            "tx": shift[:, 0], "ty": shift[:, 1], "tz": shift[:, 2],
+        }))
+    columns = ["id", "variant", "rotation_deg", "scale", "tx", "ty", "tz"]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def apply_affine(features: np.ndarray, rotation_deg: np.ndarray, scale: np.ndarray,
+                 translation: np.ndarray) -> np.ndarray:
+    """
+    Materialize K affine variants of one sequence in a single einsum.
+
+    xyz' = scale * (xyz @ R^T) + t with R a yaw rotation, the same affine as
+    BatchAugment; visibility is unchanged. The temporal shift of BatchAugment
+    depends on the window, not the sample, and stays online (see
+    create_dataloaders).
+
+    Args:
+        features: [T, 75, 4] float32 features
+        rotation_deg, scale: [K] parameters
+        translation: [K, 3] parameters
+    Returns:
+        variants: [K, T, 75, 4] float32
+    """
+    angle = np.deg2rad(np.asarray(rotation_deg, dtype=np.float64))
+    cos_a, sin_a = np.cos(angle), np.sin(angle)
+    R = np.zeros((len(angle), 3, 3))
+    R[:, 0, 0], R[:, 0, 1] = cos_a, -sin_a
+    R[:, 1, 0], R[:, 1, 1] = sin_a, cos_a
+    R[:, 2, 2] = 1.0
+    A = (np.asarray(scale)[:, None, None] * R).astype(np.float32)           # [K, 3, 3]
+
+    shift = np.asarray(translation, dtype=np.float32)[:, None, None, :]     # [K, 1, 1, 3]
+
+    variants = np.empty((len(angle),) + features.shape, dtype=np.float32)
+    variants[..., :3] = np.einsum("tnj,kij->ktni", features[..., :3], A) + shift
+    variants[..., 3] = features[..., 3]
+    return variants
+
+
+def write_variants(
+    features_dir: str,
+    out_dir: str,
+    ids: Iterable[str],
+    num_variants: int = 4,
+    seed: int = 0,
+    **ranges
+) -> pd.DataFrame:
+    """
+    Precompute num_variants augmented copies of every sample (offline augmentation).
+
+    Each sample's variants are stored as one [K, T, 75, 4] {id}.npy in the
+    encoding of features_dir, so a window of any variant is a single slice of
+    a memory map. The parameters used are written to params.csv and the
+    configuration to augment.json. Outputs are fingerprinted like the
+    preprocessing scripts, so reruns only redo changed samples.
+
+    Args:
+        features_dir: Directory of preprocessed {id}.npy features
+        out_dir: Output directory for the variant store
+        ids: Sample ids to augment (typically the train split)
+        num_variants: Variants per sample (K)
+        seed: Base seed of the parameter draw
+        **ranges: Distribution parameters of draw_variant_params
+    Returns:
+        params: the parameter table
+    """
+    features_dir = Path(features_dir)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    encoding = load_encoding(features_dir)
+    if encoding is not None:
+        save_encoding(out_dir, encoding)
+    else:
+        (out_dir / ENCODING_FILE).unlink(missing_ok=True)
+
+    ids = [sample_id for sample_id in ids if (features_dir / f"{sample_id}.npy").exists()]
+    params = draw_variant_params(ids, num_variants, seed, **ranges)
+    config = dict(num_variants=num_variants, seed=seed, **ranges, encoding=encoding)
+
+    expected = {sample_id: fingerprint(config, file_identity(features_dir / f"{sample_id}.npy")) for sample_id in ids}
+    todo = set(stale_ids(ids, out_dir, expected))
+    for sample_id, rows in params.groupby("id", sort=False):
+        if sample_id not in todo:
+            continue
+        features = decode_features(np.load(features_dir / f"{sample_id}.npy"), encoding)
+        variants = apply_affine(features, rows["rotation_deg"].to_numpy(), rows["scale"].to_numpy(),
+                                rows[["tx", "ty", "tz"]].to_numpy())
+        atomic_save_npy(out_dir / f"{sample_id}.npy", encode_features(variants, encoding))
+        append_fingerprints(out_dir, {sample_id: expected[sample_id]})
+    compact_fingerprints(out_dir)
+
+    params.to_csv(out_dir / PARAMS_FILE, index=False)
+    (out_dir / AUGMENT_FILE).write_text(json.dumps(dict(config, samples=len(ids)), indent=2))
+    print(f"Wrote {num_variants} variants for {len(todo)} samples ({len(ids) - len(todo)} up to date) → {out_dir}")
+    return params
+
+
+class VariantStore:
+    """
+    Read-only access to precomputed augmentation variants (see write_variants).
+
+    Variant files are memory-mapped per read, so a window of a variant costs
+    the same as a window of the un-augmented features and no augmentation
+    math runs in the loader.
+    """
+
+    def __init__(self, store_dir: str):
+        """
+        Args:
+            store_dir: Directory written by write_variants
+        """
+        self.store_dir = Path(store_dir)
+        self.config = json.loads((self.store_dir / AUGMENT_FILE).read_text())
+        self.num_variants = int(self.config["num_variants"])
+        self.encoding = load_encoding(self.store_dir)
+        self.params = pd.read_csv(self.store_dir / PARAMS_FILE, dtype={"id": str})
+        self.ids = set(self.params["id"])
+
+    def __contains__(self, sample_id: str) -> bool:
+        return sample_id in self.ids
+
+    def read(self, sample_id: str, variant: int, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """
+        Frames [start, end) of one variant of a sample.
+
+        Returns:
+            features: [end - start, 75, 4] float32 (read-only view for float32 stores)
+        """
+        frames = np.load(self.store_dir / f"{sample_id}.npy", mmap_mode="r")[variant, start:end]
+        return decode_features(frames, self.encoding)
@@ -0,0 +1,149 @@
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from src.preprocessing.landmarks import FEATURE_LEFT_HAND, FEATURE_RIGHT_HAND, NUM_FEATURE_LANDMARKS
+from src.preprocessing.smoothing import _sequence_starts
+
+# Derived channels computed from [T, 75, 4] features and their per-frame shapes.
+# A point counts as present in a frame when its visibility is > 0 (hand points
+# are 1 when tracked, 0 when the hand is missing).
+DERIVED_VERSION = 1  # bump when a code change alters a channel
+DERIVED_CHANNELS = {
+    "velocity": (NUM_FEATURE_LANDMARKS, 3),  # x, y, z difference to the previous frame
+    "hand_relative": (42, 3),                # left then right hand joints minus their wrist
+    "hand_distance": (21,),                  # |left joint i - right joint i|
+}
+LAYOUT_FILE = "channels.json"
+
+
+def velocity(features: np.ndarray, lengths: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Frame-to-frame displacement of every point.
+
+    Zero in the first frame of every sequence and wherever the point is
+    missing in either of the two frames, so dropouts do not show up as jumps.
+
+    Returns:
+        velocity: [T, 75, 3]
+    """
+    xyz = features[..., :3]
+    present = features[..., 3] > 0
+    out = np.zeros_like(xyz)
+    if len(features) < 2:
+        return out
+    out[1:] = np.where((present[1:] & present[:-1])[..., None], xyz[1:] - xyz[:-1], 0.0)
+    out[_sequence_starts(len(features), lengths)] = 0.0
+    return out
+
+
+def hand_relative(features: np.ndarray, lengths: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Hand joints relative to their wrist (joint 0), zero where the hand is missing.
+
+    Returns:
+        relative: [T, 42, 3] (left hand 21, right hand 21)
+    """
+    hands = np.concatenate([features[:, FEATURE_LEFT_HAND], features[:, FEATURE_RIGHT_HAND]], axis=1)
+    hands = hands.reshape(len(features), 2, 21, 4)
+    relative = hands[..., :3] - hands[:, :, :1, :3]
+    present = hands[..., 3] > 0
+    present = present & present[:, :, :1]
+    return np.where(present[..., None], relative, 0.0).reshape(len(features), 42, 3)
+
+
+def hand_distance(features: np.ndarray, lengths: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Distance between matching joints of the two hands, zero unless both hands are present.
+
+    Returns:
+        distance: [T, 21]
+    """
+    left, right = features[:, FEATURE_LEFT_HAND], features[:, FEATURE_RIGHT_HAND]
+    d = left[..., :3] - right[..., :3]
+    distance = np.sqrt(np.einsum("tjd,tjd->tj", d, d))
+    return np.where((left[..., 3] > 0) & (right[..., 3] > 0), distance, 0.0)
+
+
+CHANNEL_FUNCTIONS = {
+    "velocity": velocity,
+    "hand_relative": hand_relative,
+    "hand_distance": hand_distance,
+}
+
+
+def channel_layout(channels: Sequence[str]) -> Dict:
+    """
+    Column layout of a derived-channel file: channels are flattened per frame
+    and concatenated in the given order.
+
+    Returns:
+        layout: {"version", "source", "width", "channels": [{name, shape, offset, width}]}
+    """
+    entries, offset = [], 0
+    for name in channels:
+        if name not in DERIVED_CHANNELS:
+            raise ValueError(f"Unknown derived channel '{name}', expected one of {list(DERIVED_CHANNELS)}")
+        shape = list(DERIVED_CHANNELS[name])
+        width = int(np.prod(shape))
+        entries.append(dict(name=name, shape=shape, offset=offset, width=width))
+        offset += width
+    return dict(version=DERIVED_VERSION, source="pose33+left21+right21", width=offset, channels=entries)
+
+
+def compute_derived(features: np.ndarray, channels: Sequence[str],
+                    lengths: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Compute derived channels of [T, 75, 4] float32 features in one pass.
+
+    Args:
+        features: [T, 75, 4] features, or several sequences concatenated along time
+        channels: Channel names (keys of DERIVED_CHANNELS), in storage order
+        lengths: Lengths of the concatenated sequences (None: one sequence)
+    Returns:
+        derived: [T, C] float32 with columns as described by channel_layout(channels)
+    """
+    layout = channel_layout(channels)
+    derived = np.empty((len(features), layout["width"]), dtype=np.float32)
+    for entry in layout["channels"]:
+        values = CHANNEL_FUNCTIONS[entry["name"]](features, lengths)
+        derived[:, entry["offset"]:entry["offset"] + entry["width"]] = values.reshape(len(features), -1)
+    return derived
+
+
+def save_layout(directory: Path, layout: Dict) -> None:
+    """Write the channel layout next to the derived-channel files."""
+    path = Path(directory) / LAYOUT_FILE
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(layout, indent=2))
+    tmp_path.replace(path)
+
+
+def load_layout(directory: Path) -> Optional[Dict]:
+    """Channel layout of a derived-channel directory (None if absent)."""
+    path = Path(directory) / LAYOUT_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def channel_columns(layout: Optional[Dict], channels: Sequence[str]) -> np.ndarray:
+    """
+    Column indices of the requested channels in files with the given layout.
+
+    Raises:
+        ValueError: if the layout is missing, from another DERIVED_VERSION, or
+            lacks a requested channel
+    """
+    if layout is None:
+        raise ValueError(f"No {LAYOUT_FILE} found; run preprocess_features.py with --derived")
+    if layout.get("version") != DERIVED_VERSION:
+        raise ValueError(f"Derived channels are version {layout.get('version')}, expected {DERIVED_VERSION}; "
+                         f"rerun preprocess_features.py with --derived")
+    entries = {entry["name"]: entry for entry in layout["channels"]}
+    missing = [name for name in channels if name not in entries]
+    if missing:
+        raise ValueError(f"Derived channels {missing} not stored (available: {list(entries)})")
+    return np.concatenate([np.arange(entries[name]["offset"], entries[name]["offset"] + entries[name]["width"])
+                           for name in channels]) if channels else np.zeros(0, dtype=np.int64)
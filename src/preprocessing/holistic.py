@@ -0,0 +1,167 @@
+import numpy as np
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from src.preprocessing.landmarks import IDX_FACE, IDX_LEFT_HAND, IDX_POSE, IDX_RIGHT_HAND, NUM_LANDMARKS
+
+# Wire format of a serialized NormalizedLandmarkList: one length-delimited
+# record (tag 0x0a, length byte) per landmark, holding fixed32 fields
+# (tag byte + 4-byte little-endian float): x, y, z, visibility, presence
+_LIST_TAG = 0x0a
+_FIELD_COLUMN = {0x0d: 0, 0x15: 1, 0x1d: 2, 0x25: 3}  # x, y, z, visibility (presence is dropped)
+_FIXED32 = 5
+
+
+@lru_cache(maxsize=None)
+def _record_layout(structure: bytes) -> Optional[Tuple[np.ndarray, np.ndarray, List[int], List[int]]]:
+    """
+    Byte positions and expected values of the non-float bytes of a landmark
+    record, and which float goes to which column; None if the record is not
+    a length-delimited run of fixed32 fields.
+    """
+    tags = structure[2:]
+    if structure[0] != _LIST_TAG or structure[1] != _FIXED32 * len(tags):
+        return None
+    if any(tag & 7 != _FIXED32 for tag in tags):
+        return None
+    positions = np.r_[0, 1, 2 + _FIXED32 * np.arange(len(tags))]
+    fields = [j for j, tag in enumerate(tags) if tag in _FIELD_COLUMN]
+    columns = [_FIELD_COLUMN[tags[j]] for j in fields]
+    return positions, np.frombuffer(structure, dtype=np.uint8), fields, columns
+
+
+def decode_landmark_list(data: bytes, n: int) -> Optional[np.ndarray]:
+    """
+    Decode a serialized NormalizedLandmarkList without touching landmarks in Python.
+
+    MediaPipe sets the same fields on every landmark of a list, so all
+    records have the same size and structure: the structure is checked for
+    all records at once and the floats are read through one strided view.
+    Fields that are not set decode as 0 (as protobuf getters return).
+
+    Args:
+        data: landmark_list.SerializeToString()
+        n: Number of landmarks in the list
+    Returns:
+        landmarks: [n, 4] float32 (x, y, z, visibility), or None if the records
+            are not uniform (use the per-landmark path then)
+    """
+    if n == 0 or len(data) % n:
+        return None
+    width = len(data) // n
+    if width < 2 + _FIXED32 or (width - 2) % _FIXED32 or width - 2 >= 128:
+        return None
+    layout = _record_layout(data[:2] + data[2:width:_FIXED32])
+    if layout is None:
+        return None
+    positions, expected, fields, columns = layout
+
+    records = np.frombuffer(data, dtype=np.uint8).reshape(n, width)
+    if not (records[:, positions] == expected).all():
+        return None
+    values = np.ndarray((n, len(positions) - 2), dtype="<f4", buffer=data, offset=3, strides=(width, _FIXED32))
+
+    landmarks = np.zeros((n, 4), dtype=np.float32)
+    landmarks[:, columns] = values[:, fields]
+    return landmarks
+
+
+def fill_landmarks(out: np.ndarray, landmark_list, visibility: bool = True) -> np.ndarray:
+    """
+    Write one body part's landmarks into a slice of a preallocated buffer.
+
+    Args:
+        out: [N, 4] destination (e.g. frame[IDX_POSE])
+        landmark_list: MediaPipe NormalizedLandmarkList, or None when the part
+            was not detected (the slice is zeroed)
+        visibility: Take the 4th column from the landmarks' visibility;
+            False writes 1.0 (detected) instead
+    Returns:
+        out
+    """
+    if landmark_list is None or not landmark_list.landmark:
+        out[:] = 0
+        return out
+
+    landmarks = None
+    if hasattr(landmark_list, "SerializeToString"):
+        landmarks = decode_landmark_list(landmark_list.SerializeToString(), len(landmark_list.landmark))
+    if landmarks is None:
+        landmarks = np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmark_list.landmark],
+                             dtype=np.float32)
+
+    out[:, :3] = landmarks[:, :3]
+    out[:, 3] = landmarks[:, 3] if visibility else 1.0
+    return out
+
+
+def holistic_to_array(results, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Holistic results → [543, 4] landmarks (face, pose, left hand, right hand).
+
+    Every part goes to its fixed slice of out, so a [T, 543, 4] buffer can be
+    preallocated per video and filled frame by frame (out=buffer[t]). Face
+    and hand points get visibility 1.0 when detected, pose points keep
+    MediaPipe's visibility; parts that were not detected are zero.
+
+    Args:
+        results: Output of mp.solutions.holistic.Holistic.process
+        out: Optional [543, 4] float32 destination
+    Returns:
+        landmarks: out, or a new [543, 4] float32 array
+    """
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    fill_landmarks(out[IDX_FACE], results.face_landmarks, visibility=False)
+    fill_landmarks(out[IDX_POSE], results.pose_landmarks, visibility=True)
+    fill_landmarks(out[IDX_LEFT_HAND], results.left_hand_landmarks, visibility=False)
+    fill_landmarks(out[IDX_RIGHT_HAND], results.right_hand_landmarks, visibility=False)
+    return out
+
+
+def crop_rect(box, width: int, height: int, margin: float = 0.0) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Pixel crop around a normalized box, grown by margin on every side.
+
+    Args:
+        box: (x, y, w, h) in [0, 1] frame coordinates, e.g. the MS-ASL signer box
+        width, height: Frame size in pixels
+        margin: Growth per side as a fraction of the box size
+    Returns:
+        (x0, y0, x1, y1) clipped to the frame, or None if the box is missing
+        or empty (use the full frame then)
+    """
+    if box is None or width <= 0 or height <= 0:
+        return None
+    x, y, w, h = (float(v) for v in box)
+    if not np.isfinite([x, y, w, h]).all() or w <= 0 or h <= 0:
+        return None
+    x0 = int(np.floor(max(x - margin * w, 0.0) * width))
+    y0 = int(np.floor(max(y - margin * h, 0.0) * height))
+    x1 = int(np.ceil(min(x + w + margin * w, 1.0) * width))
+    y1 = int(np.ceil(min(y + h + margin * h, 1.0) * height))
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    return x0, y0, x1, y1
+
+
+def crop_to_frame(pts: np.ndarray, roi: Tuple[float, float, float, float]) -> np.ndarray:
+    """
+    Map landmarks of a cropped (and possibly downscaled) image back to
+    normalized coordinates of the full frame.
+
+    Downscaling keeps normalized coordinates, so only the crop matters:
+    x → x0 + x * w, y → y0 + y * h, and z, which MediaPipe scales like x,
+    → z * w. Points of parts that were not detected stay zero.
+
+    Args:
+        pts: [..., N, 4] landmarks in crop coordinates (modified in place)
+        roi: (x0, y0, w, h) of the crop in normalized frame coordinates
+    Returns:
+        pts: [..., N, 4] landmarks in frame coordinates
+    """
+    x0, y0, w, h = roi
+    detected = np.any(pts != 0, axis=-1)
+    pts[..., :3] = np.where(detected[..., None], pts[..., :3] * np.float32([w, h, w]) + np.float32([x0, y0, 0]),
+                            pts[..., :3])
+    return pts
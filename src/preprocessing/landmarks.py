@@ -0,0 +1,100 @@
+import numpy as np
+
+# MediaPipe Holistic layout written by extract_landmarks.py:
+# face(468), pose(33), left hand(21), right hand(21) → [T, 543, 4] (x, y, z, visibility)
+NUM_LANDMARKS = 543
+IDX_FACE = slice(0, 468)
+IDX_POSE = slice(468, 468+33)
+IDX_LEFT_HAND = slice(468+33, 468+33+21)
+IDX_RIGHT_HAND = slice(468+33+21, 468+33+21+21)
+
+# Feature layout: pose(33), left hand(21), right hand(21) → [T, 75, 4]
+NUM_FEATURE_LANDMARKS = 75
+FEATURE_POSE = slice(0, 33)
+FEATURE_LEFT_HAND = slice(33, 54)
+FEATURE_RIGHT_HAND = slice(54, 75)
+FEATURE_INDEX = np.r_[IDX_POSE, IDX_LEFT_HAND, IDX_RIGHT_HAND]  # feature point → Holistic point
+
+# Key pose landmarks for normalization (shoulders, hips) in the full array
+LEFT_SHOULDER_FULL = 468 + 11   # pose landmark 11 in full array
+RIGHT_SHOULDER_FULL = 468 + 12  # pose landmark 12 in full array
+LEFT_HIP_FULL = 468 + 23        # pose landmark 23 in full array
+RIGHT_HIP_FULL = 468 + 24       # pose landmark 24 in full array
+
+# ... and in the feature array (pose only, 33 landmarks starting at index 0)
+LEFT_SHOULDER_EXTRACTED = 11    # pose landmark 11 in extracted array
+RIGHT_SHOULDER_EXTRACTED = 12   # pose landmark 12 in extracted array
+LEFT_HIP_EXTRACTED = 23         # pose landmark 23 in extracted array
+RIGHT_HIP_EXTRACTED = 24        # pose landmark 24 in extracted array
+
+
+def extract_relevant_landmarks(pts: np.ndarray) -> np.ndarray:
+    """
+    Extract only relevant landmarks (pose + hands, skip face).
+    Face landmarks (468 points) are often noisy and less critical for ASL.
+
+    Args:
+        pts: [..., 543, 4] full landmarks (any leading dims, e.g. [T] or [B, T])
+    Returns:
+        relevant: [..., 75, 4] (pose 33 + left hand 21 + right hand 21)
+    """
+    return np.take(pts, FEATURE_INDEX, axis=-2)
+
+
+def clip_xy(pts: np.ndarray, low: float = 0.0, high: float = 1.0) -> np.ndarray:
+    """
+    Clip x, y to the image (MediaPipe coordinates are normalized to [0, 1];
+    z is relative and left alone). Modifies pts in place and returns it.
+    """
+    pts[..., :2] = np.clip(pts[..., :2], low, high)
+    return pts
+
+
+def normalize_torso(pts: np.ndarray, left_shoulder: int, right_shoulder: int,
+                    left_hip: int, right_hip: int) -> np.ndarray:
+    """
+    Center every frame on the shoulder/hip midpoint and scale by shoulder width.
+
+    Frames are independent, so any number of frames (one sequence, several
+    concatenated sequences or a [B, T] batch) is normalized in a few array
+    ops. Frames without a valid pose are left unchanged.
+
+    Args:
+        pts: [..., N, 4] landmarks
+        left_shoulder, right_shoulder, left_hip, right_hip: landmark indices
+    Returns:
+        normalized: array of the same shape
+    """
+    # Get shoulder and hip positions for every frame
+    ls = pts[..., left_shoulder, :3]
+    rs = pts[..., right_shoulder, :3]
+    lh = pts[..., left_hip, :3]
+    rh = pts[..., right_hip, :3]
+
+    # Center point: midpoint of shoulders and hips
+    center = (ls + rs + lh + rh) / 4.0
+
+    # Scale: shoulder width (batched dot product: same reduction as a per-frame
+    # np.linalg.norm, so results match a frame loop bit for bit)
+    d = rs - ls
+    shoulder_width = np.sqrt(np.matmul(d[..., None, :], d[..., :, None])[..., 0, 0])
+    scale = np.where(shoulder_width > 0.01, shoulder_width, 1.0)
+
+    # Only frames where both shoulders are visible; others keep original (likely all zeros)
+    valid = (pts[..., left_shoulder, 3] > 0) & (pts[..., right_shoulder, 3] > 0)
+
+    normalized = np.copy(pts)
+    centered = (pts[..., :3] - center[..., None, :]) / scale[..., None, None]
+    normalized[..., :3] = np.where(valid[..., None, None], centered, pts[..., :3])
+    return normalized
+
+
+def normalize_landmarks_full(pts: np.ndarray) -> np.ndarray:
+    """Torso normalization of full [..., 543, 4] Holistic landmarks."""
+    return normalize_torso(pts, LEFT_SHOULDER_FULL, RIGHT_SHOULDER_FULL, LEFT_HIP_FULL, RIGHT_HIP_FULL)
+
+
+def normalize_landmarks_extracted(pts: np.ndarray) -> np.ndarray:
+    """Torso normalization of [..., 75, 4] features (pose 33 + left hand 21 + right hand 21)."""
+    return normalize_torso(pts, LEFT_SHOULDER_EXTRACTED, RIGHT_SHOULDER_EXTRACTED,
+                           LEFT_HIP_EXTRACTED, RIGHT_HIP_EXTRACTED)
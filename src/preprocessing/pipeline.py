@@ -0,0 +1,218 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+from src.data.encoding import encode_features
+from src.preprocessing.derived import compute_derived
+from src.preprocessing.landmarks import (clip_xy, extract_relevant_landmarks, normalize_landmarks_extracted,
+                                         normalize_landmarks_full)
+from src.preprocessing.smoothing import smooth_ema, smooth_savgol
+
+# Feature stage parameters (part of every feature fingerprint, shared by
+# preprocess_features.py and the fused mode of extract_landmarks.py)
+SAVGOL_WINDOW = 5
+SAVGOL_POLYORDER = 2
+FEATURES_VERSION = 2  # bump when a code change alters the features
+
+
+class Transform(ABC):
+    """
+    A preprocessing step on landmark sequences.
+
+    Transforms take a [T, N, 4] sequence, or many sequences concatenated along
+    time together with their lengths, so a whole batch is processed with the
+    same few array ops as one sequence. Frame-wise steps ignore lengths;
+    temporal steps (smoothing) restart at every sequence.
+    """
+
+    @abstractmethod
+    def __call__(self, pts: np.ndarray, lengths: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Transform [T, N, 4] frames (lengths: sequences concatenated along time, None for one)."""
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({params})"
+
+
+class SelectPoseHands(Transform):
+    """[.., 543, 4] Holistic landmarks → [.., 75, 4] pose + left hand + right hand."""
+
+    def __call__(self, pts, lengths=None):
+        return extract_relevant_landmarks(pts)
+
+
+class ClipXY(Transform):
+    """Clip x, y to [low, high] (image coordinates)."""
+
+    def __init__(self, low: float = 0.0, high: float = 1.0):
+        self.low = low
+        self.high = high
+
+    def __call__(self, pts, lengths=None):
+        return clip_xy(np.copy(pts), self.low, self.high)
+
+
+class EMASmooth(Transform):
+    """Exponential moving average over time."""
+
+    def __init__(self, alpha: float = 0.4):
+        self.alpha = alpha
+
+    def __call__(self, pts, lengths=None):
+        if len(pts) <= 1:
+            return pts
+        return smooth_ema(pts, self.alpha, lengths)
+
+
+class NormalizeTorso(Transform):
+    """Center on the torso and scale by shoulder width ('features' = 75-point, 'full' = 543-point layout)."""
+
+    def __init__(self, layout: str = "features"):
+        if layout not in ("features", "full"):
+            raise ValueError(f"Unknown layout '{layout}', expected 'features' or 'full'")
+        self.layout = layout
+
+    def __call__(self, pts, lengths=None):
+        if self.layout == "full":
+            return normalize_landmarks_full(pts)
+        return normalize_landmarks_extracted(pts)
+
+
+class SavgolSmooth(Transform):
+    """Mask-aware Savitzky-Golay smoothing over time."""
+
+    def __init__(self, window_length: int = 5, polyorder: int = 2):
+        self.window_length = window_length
+        self.polyorder = polyorder
+
+    def __call__(self, pts, lengths=None):
+        return smooth_savgol(pts, self.window_length, self.polyorder, lengths)
+
+
+class Encode(Transform):
+    """Encode float32 features for storage (see src.data.encoding)."""
+
+    def __init__(self, encoding: Optional[Dict] = None):
+        self.encoding = encoding
+
+    def __call__(self, pts, lengths=None):
+        return encode_features(pts, self.encoding)
+
+
+class DeriveChannels(Transform):
+    """[T, 75, 4] features → [T, C] derived channels (see src.preprocessing.derived)."""
+
+    def __init__(self, channels: Sequence[str] = ("velocity", "hand_relative", "hand_distance")):
+        self.channels = list(channels)
+
+    def __call__(self, pts, lengths=None):
+        return compute_derived(pts, self.channels, lengths)
+
+
+class Compose(Transform):
+    """Apply transforms in order; batch() runs them over many sequences at once."""
+
+    def __init__(self, transforms: Sequence[Transform]):
+        self.transforms = list(transforms)
+
+    def __call__(self, pts, lengths=None):
+        for transform in self.transforms:
+            pts = transform(pts, lengths)
+        return pts
+
+    def batch(self, sequences: Sequence[np.ndarray], block_frames: int = 512,
+              max_batched_frames: int = 24) -> List[np.ndarray]:
+        """
+        Transform many variable-length sequences with few array passes.
+
+        Short sequences are concatenated into blocks of about block_frames
+        frames and each block is transformed in one pass, so short clips (e.g.
+        single-frame images) share the per-call overhead while blocks stay
+        cache friendly. Longer sequences already amortize it: in
+        benchmark_preprocessing.py batching stops paying off at about 30
+        frames, so sequences of max_batched_frames frames or more are
+        transformed on their own.
+
+        Args:
+            sequences: list of [T_i, N, 4] arrays
+            block_frames: Target number of frames per pass
+            max_batched_frames: Sequences at least this long are not batched
+        Returns:
+            outputs: list of transformed [T_i, ...] arrays (same order)
+        """
+        outputs = []
+        block, lengths = [], []
+
+        def flush():
+            if block:
+                out = self(np.concatenate(block, axis=0), lengths)
+                outputs.extend(np.split(out, np.cumsum(lengths)[:-1]))
+                block.clear()
+                lengths.clear()
+
+        for seq in sequences:
+            if len(seq) >= max_batched_frames:
+                flush()
+                outputs.append(self(seq))
+                continue
+            block.append(seq)
+            lengths.append(len(seq))
+            if sum(lengths) >= block_frames:
+                flush()
+        flush()
+        return outputs
+
+    def __repr__(self) -> str:
+        return "Compose([\n" + "".join(f"    {t!r},\n" for t in self.transforms) + "])"
+
+
+def feature_params(savgol_window: int = SAVGOL_WINDOW, savgol_polyorder: int = SAVGOL_POLYORDER,
+                   encoding: Optional[Dict] = None) -> Dict:
+    """
+    Parameters that determine a feature file, used both to process samples and
+    to fingerprint the outputs.
+
+    Args:
+        savgol_window, savgol_polyorder: Savitzky-Golay smoothing parameters
+        encoding: On-disk encoding (see src.data.encoding), None before one is chosen
+    Returns:
+        params: JSON-serializable parameter dict
+    """
+    return dict(
+        stage="features",
+        version=FEATURES_VERSION,
+        layout="pose33+left21+right21",
+        normalization="torso_center/shoulder_width",
+        savgol_window=savgol_window,
+        savgol_polyorder=savgol_polyorder,
+        encoding=encoding,
+    )
+
+
+def feature_pipeline(savgol_window: int = SAVGOL_WINDOW, savgol_polyorder: int = SAVGOL_POLYORDER) -> Compose:
+    """
+    Raw landmarks (as saved by extract_landmarks.py) → [T, 75, 4] features:
+    the transform chain of scripts/2_preprocessing/preprocess_features.py.
+    """
+    return Compose([
+        SelectPoseHands(),
+        NormalizeTorso("features"),
+        SavgolSmooth(savgol_window, savgol_polyorder),
+    ])
+
+
+def fused_pipeline(ema_alpha: float = 0.4, savgol_window: int = SAVGOL_WINDOW,
+                   savgol_polyorder: int = SAVGOL_POLYORDER) -> Compose:
+    """
+    Holistic output straight to [T, 75, 4] features (extract_landmarks.py
+    --mode features, or a live recognizer). Clip and EMA act per point, so
+    running them after the selection matches saving 543-point landmarks and
+    running feature_pipeline on them.
+    """
+    return Compose([
+        SelectPoseHands(),
+        ClipXY(),
+        EMASmooth(ema_alpha),
+        NormalizeTorso("features"),
+        SavgolSmooth(savgol_window, savgol_polyorder),
+    ])
@@ -0,0 +1,151 @@
+import numpy as np
+from functools import lru_cache
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import savgol_coeffs
+from typing import Optional, Sequence
+
+
+def _sequence_starts(total: int, lengths: Optional[Sequence[int]]) -> np.ndarray:
+    """First frame of every sequence in a [sum(lengths), ...] concatenation."""
+    if lengths is None:
+        return np.array([0])
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if lengths.sum() != total:
+        raise ValueError(f"lengths sum to {lengths.sum()} but the array has {total} frames")
+    return np.cumsum(lengths) - lengths
+
+
+def smooth_ema(arr: np.ndarray, alpha: float = 0.4, lengths: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Exponential moving average over time: out[t] = alpha * arr[t] + (1 - alpha) * out[t - 1].
+
+    Mask-aware: a landmark is missing in a frame when its visibility (last
+    channel) is 0. Missing frames stay untouched and the average restarts
+    when the landmark reappears, so a hand dropping out mid-clip neither
+    decays towards zero nor looks present through a decaying visibility.
+
+    Args:
+        arr: [T, ..., D] landmarks with visibility as the last channel, or
+            several sequences concatenated along time
+        alpha: Weight of the current frame
+        lengths: Lengths of the concatenated sequences (None: one sequence);
+            the average restarts at every sequence
+    Returns:
+        smoothed: array of the same shape
+    """
+    out = np.copy(arr)
+    present = arr[..., -1] > 0
+    if lengths is None:
+        for t in range(1, len(arr)):
+            tracked = (present[t] & present[t-1])[..., None]
+            out[t] = np.where(tracked, alpha*arr[t] + (1-alpha)*out[t-1], arr[t])
+        return out
+
+    starts = _sequence_starts(len(arr), lengths)
+    lengths = np.diff(np.append(starts, len(arr)))
+
+    # The recursion runs over the frame position; all sequences advance together
+    for k in range(1, int(lengths.max(initial=0))):
+        idx = starts[lengths > k] + k
+        tracked = (present[idx] & present[idx - 1])[..., None]
+        out[idx] = np.where(tracked, alpha*arr[idx] + (1-alpha)*out[idx - 1], arr[idx])
+    return out
+
+
+@lru_cache(maxsize=None)
+def savgol_matrix(window_length: int, polyorder: int) -> np.ndarray:
+    """
+    Savitzky-Golay coefficients for every evaluation position in a window.
+
+    Row p evaluates the local polynomial fit at position p of the window, so
+    row window_length // 2 is the usual centered filter and the other rows
+    reproduce savgol_filter's mode='interp' handling of the edges.
+
+    Returns:
+        coeffs: [window_length, window_length] read-only array (cached)
+    """
+    coeffs = np.stack([savgol_coeffs(window_length, polyorder, pos=p, use="dot")
+                       for p in range(window_length)])
+    coeffs.flags.writeable = False
+    return coeffs
+
+
+def smooth_savgol(
+    arr: np.ndarray,
+    window_length: int = 5,
+    polyorder: int = 2,
+    lengths: Optional[Sequence[int]] = None
+) -> np.ndarray:
+    """
+    Apply Savitzky-Golay smoothing to reduce jitter.
+
+    All channels are filtered at once along time with precomputed SG
+    coefficients. Smoothing is mask-aware: a landmark is missing in a frame
+    when its visibility (last channel) is 0, missing frames stay untouched,
+    and each contiguous run of present frames is smoothed on its own (runs
+    shorter than the window are left as is), so a hand dropping out mid-clip
+    is never smeared into real coordinates. Visibility rather than all-zero
+    values marks a gap because torso normalization moves the zeros of a
+    missing point to (0 - center) / scale. Concatenated sequences (lengths)
+    are smoothed independently in the same pass.
+
+    Args:
+        arr: [T, N, D] landmarks with visibility as the last channel, or
+            several sequences concatenated along time
+        window_length: smoothing window (made odd by adding 1)
+        polyorder: polynomial order
+        lengths: Lengths of the concatenated sequences (None: one sequence)
+    Returns:
+        smoothed: [T, N, D] array
+    """
+    longest = len(arr) if lengths is None else max(lengths, default=0)
+    if longest < window_length:
+        return arr  # too short to smooth
+
+    # Ensure window_length is odd
+    if window_length % 2 == 0:
+        window_length += 1
+    if longest < window_length:
+        return arr
+    half = window_length // 2
+
+    T, N, D = arr.shape
+    x = arr.astype(np.float64)                                # [T, N, D]
+
+    # Per-frame presence of each landmark
+    valid = arr[..., -1] > 0                                  # [T, N]
+
+    # Runs also break where one sequence ends and the next begins
+    first = np.zeros((T, 1), dtype=bool)
+    first[_sequence_starts(T, lengths)] = True
+    last = np.roll(first, -1, axis=0)
+
+    # Bounds [run_start, run_end) of the run of present frames containing each frame
+    t = np.arange(T)[:, None]
+    prev_valid = np.vstack([np.zeros((1, N), bool), valid[:-1]]) & ~first
+    next_valid = np.vstack([valid[1:], np.zeros((1, N), bool)]) & ~last
+    run_start = np.maximum.accumulate(np.where(valid & ~prev_valid, t, 0), axis=0)
+    run_end = np.minimum.accumulate(np.where(valid & ~next_valid, t + 1, T)[::-1], axis=0)[::-1]
+    smooth = valid & (run_end - run_start >= window_length)
+
+    # Interior frames: the centered filter as a sum of shifted, contiguous slices
+    coeffs = savgol_matrix(window_length, polyorder)
+    filtered = np.copy(x)
+    center = filtered[half:T - half]
+    center[...] = coeffs[half, 0] * x[:T - 2 * half]
+    for k in range(1, window_length):
+        center += coeffs[half, k] * x[k:T - 2 * half + k]
+
+    # Frames within half a window of a run edge: shifted window + matching coefficient row
+    near_start = t - run_start < half
+    near_end = run_end - 1 - t < half
+    ti, ni = np.nonzero(smooth & (near_start | near_end))
+    start, end = run_start[ti, ni], run_end[ti, ni]
+    at_start = near_start[ti, ni]
+    anchor = np.where(at_start, start, end - window_length)
+    row = np.where(at_start, ti - start, window_length - (end - ti))
+    windows = sliding_window_view(x, window_length, axis=0)   # [T - w + 1, N, D, w]
+    filtered[ti, ni] = np.einsum("kdw,kw->kd", windows[anchor, ni], coeffs[row])
+
+    smoothed = np.where(smooth[..., None], filtered, x).astype(arr.dtype)
+    return smoothed
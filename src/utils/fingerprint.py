@@ -0,0 +1,123 @@
+import csv
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+FINGERPRINT_FILE = "fingerprints.csv"
+LOG_HEADER = ["id", "fingerprint", "stage"]
+
+
+def file_identity(path: str, content_hash: bool = False) -> str:
+    """
+    Identity of an input file: "size:mtime_ns", or a SHA-1 of its content.
+
+    The content hash survives copies and touches at the cost of reading the
+    whole file; "missing" is returned for files that do not exist.
+    """
+    path = Path(path)
+    if not path.exists():
+        return "missing"
+    if not content_hash:
+        stat = path.stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(params: Mapping, input_identity: str) -> str:
+    """Short hash of the stage parameters together with the input's identity."""
+    payload = json.dumps({"params": params, "input": input_identity}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _read_log(out_dir: str) -> Dict[str, Tuple[str, str]]:
+    """
+    Recorded id → (fingerprint, stage) of the outputs in out_dir (empty if none yet).
+
+    The file is an append-only log, so the last entry of an id wins and a
+    line cut short by a killed run is ignored. Logs written before the stage
+    column existed read with an empty stage.
+    """
+    path = Path(out_dir) / FINGERPRINT_FILE
+    if not path.exists():
+        return {}
+    recorded = {}
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if len(row) in (2, 3) and len(row[1]) == 16 and row[0] != "id":
+                recorded[row[0]] = (row[1], row[2] if len(row) == 3 else "")
+    return recorded
+
+
+def load_fingerprints(out_dir: str) -> Dict[str, str]:
+    """Recorded id → fingerprint of the outputs in out_dir (empty if none yet)."""
+    return {sample_id: fp for sample_id, (fp, _) in _read_log(out_dir).items()}
+
+
+def load_stages(out_dir: str) -> Dict[str, str]:
+    """
+    Recorded id → name of the stage that last wrote its output in out_dir.
+
+    Lets a stage tell its own outputs from ones another stage wrote into the
+    same directory (e.g. features from fused landmark extraction).
+    """
+    return {sample_id: stage for sample_id, (_, stage) in _read_log(out_dir).items()}
+
+
+def append_fingerprints(out_dir: str, fingerprints: Mapping[str, str], stage: str = "") -> None:
+    """
+    Record fingerprints of freshly written outputs.
+
+    Appending is cheap enough to call after every sample or chunk, so an
+    interrupted run keeps the fingerprints of everything it finished.
+
+    Args:
+        out_dir: Directory holding the outputs and the fingerprint log
+        fingerprints: id → fingerprint of the outputs just written
+        stage: Name of the stage that wrote them (see load_stages)
+    """
+    if not fingerprints:
+        return
+    path = Path(out_dir) / FINGERPRINT_FILE
+    new_file = not path.exists()
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(LOG_HEADER)
+        writer.writerows((sample_id, fp, stage) for sample_id, fp in fingerprints.items())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def compact_fingerprints(out_dir: str) -> None:
+    """Rewrite the fingerprint log with one (latest) entry per id."""
+    recorded = _read_log(out_dir)
+    path = Path(out_dir) / FINGERPRINT_FILE
+    tmp_path = path.with_suffix(".csv.tmp")
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(LOG_HEADER)
+        writer.writerows((sample_id, fp, stage) for sample_id, (fp, stage) in sorted(recorded.items()))
+    tmp_path.replace(path)
+
+
+def stale_ids(ids: Iterable[str], out_dir: str, expected: Mapping[str, str]) -> List[str]:
+    """
+    Ids whose output in out_dir is missing or was made with other parameters/inputs.
+
+    Args:
+        ids: Candidate sample ids
+        out_dir: Directory holding {id}.npy outputs and the fingerprint log
+        expected: id → fingerprint the output should have now
+    """
+    out_dir = Path(out_dir)
+    recorded = load_fingerprints(out_dir)
+    return [sample_id for sample_id in ids
+            if recorded.get(sample_id) != expected[sample_id]
+            or not (out_dir / f"{sample_id}.npy").exists()]
@@ -0,0 +1,22 @@
+import os
+import numpy as np
+from pathlib import Path
+
+
+def atomic_save_npy(path: str, array: np.ndarray) -> None:
+    """
+    Save an array as .npy so that readers never see a partial file.
+
+    The array is written to a temporary file next to the target and renamed
+    over it, so a run killed mid-write leaves either the old file or none.
+    Temporary files end in '.tmp' and are not picked up by '*.npy' globs.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise